@@ -23,7 +23,7 @@ The script requires the following inputs (together with consistent units). These
 + Current velocity, v (m/s) --- typically for a 1-year environment
 + Marine growth thickness, tm (m)
 + Flooding condition, f (1 for flooded; 2 for buoyant)
-+ End (boundary) conditions of the pipe (fixed: 22.2; clamped: 15.4; simply-supported: 9.87; cantilevered: 3.52)
++ End (boundary) condition of the pipe, bc (`"fixed"`, `"clamped"`, `"simply-supported"`, or `"cantilevered"`), which sets the Roark coefficient, c (22.2, 15.4, 9.87, or 3.52 respectively)
 
 #figure(
   image("/img/vivc.svg", width: 100%),
@@ -10,6 +10,9 @@ import matplotlib.pyplot as plt
 
 
 def bcoeff_ebs(D, t, l):
+    D = np.asarray(D, float)
+    t = np.asarray(t, float)
+    l = np.asarray(l, float)
     # Mechanical properties of structural steel
     # Poisson's ratio
     nu = 0.3
@@ -28,69 +31,111 @@ def bcoeff_ebs(D, t, l):
       (c) torsion and shear force, 
       (d) lateral pressure, and 
       (e) hydrostatic pressure respectively
+    stacked along the last axis
     """
-    psi = [1.0, 1.0, 5.34, 4.0, 2.0]
-    xi = [
-        (0.702 * Z_l),
-        (0.702 * Z_l),
-        (0.856 * np.power(Z_l, 0.75)),
-        1.04 * np.sqrt(Z_l),
-        1.04 * np.sqrt(Z_l),
-    ]
-    rho = [
-        (0.5 * np.power((1 + r / (150.0 * t)), -0.5)),
-        (0.5 * np.power((1 + r / (300.0 * t)), -0.5)),
-        0.6,
-        0.6,
-        0.6,
-    ]
+    psi = np.array([1.0, 1.0, 5.34, 4.0, 2.0])
+    xi = np.stack(
+        np.broadcast_arrays(
+            (0.702 * Z_l),
+            (0.702 * Z_l),
+            (0.856 * np.power(Z_l, 0.75)),
+            1.04 * np.sqrt(Z_l),
+            1.04 * np.sqrt(Z_l),
+        ),
+        axis=-1,
+    )
+    rho = np.stack(
+        np.broadcast_arrays(
+            (0.5 * np.power((1 + r / (150.0 * t)), -0.5)),
+            (0.5 * np.power((1 + r / (300.0 * t)), -0.5)),
+            0.6,
+            0.6,
+            0.6,
+        ),
+        axis=-1,
+    )
     """
-    For each array of [psi, xi, rho] coefficients, compute reduced 
+    For each set of [psi, xi, rho] coefficients, compute reduced 
     co-effcient (C) elastic buckling strength of un-stiffened cir-
     cular cylindrical shell (f_E)
     """
-    C = []
-    f_E = []
-    for i, j, k in zip(psi, xi, rho):
-        # Reduced buckling coefficient, see equation 3.4.2, DnV-RP-C202
-        c = i * np.sqrt(1 + (k * j / i) ** 2)
-        C.append(c)
-        """
-        Elastic buckling strength, see equation 3.4.1, DnV-RP-C202
-        Also applicable to:
-            Torsion and shear force when 
-                (l / r) < 3.85 * sqrt(r / t)
-            Lateral / hydrostatic pressure when 
-                (l / r) < 2.25 * sqrt(r / t)
-        """
-        f_e = (
-            c * (np.pi ** 2 * E / (12.0 * (1 - nu ** 2))) * (t / l) ** 2
-        )
-        f_E.append(f_e)
+    # Reduced buckling coefficient, see equation 3.4.2, DnV-RP-C202
+    C = psi * np.sqrt(1 + (rho * xi / psi) ** 2)
+    """
+    Elastic buckling strength, see equation 3.4.1, DnV-RP-C202
+    Also applicable to:
+        Torsion and shear force when 
+            (l / r) < 3.85 * sqrt(r / t)
+        Lateral / hydrostatic pressure when 
+            (l / r) < 2.25 * sqrt(r / t)
     """
-    Replace values of elastic buckling strength from f_E list 
+    f_E = C * (
+        (np.pi ** 2 * E / (12.0 * (1 - nu ** 2))) * (t / l) ** 2
+    )[..., None]
+    """
+    Replace values of elastic buckling strength (element-wise) 
     for long cylinders for torsion and shear force:
     """
-    if any(l / r) > (3.85 * np.sqrt(r / t)):
-        f_E[2] = 0.25 * E * np.power((t / r), 1.5)
-        pass
+    f_E[..., 2] = np.where(
+        (l / r) > (3.85 * np.sqrt(r / t)),
+        0.25 * E * np.power((t / r), 1.5),
+        f_E[..., 2],
+    )
     """
-    Replace values of elastic buckling strength from f_E list 
+    Replace values of elastic buckling strength (element-wise) 
     for long cylinders for lateral / hydrostatic pressure:
     """
-    if any(l / r) > (2.25 * np.sqrt(r / t)):
-        f_E[3] = 0.25 * E * np.power((t / r), 2)
-        f_E[4] = f_E[3]
-        pass
-    # any() is used (in above conditionals) as "l" is an iterable list
+    long = (l / r) > (2.25 * np.sqrt(r / t))
+    f_E[..., 3] = np.where(long, 0.25 * E * np.power((t / r), 2), f_E[..., 3])
+    f_E[..., 4] = np.where(long, f_E[..., 3], f_E[..., 4])
     return C, f_E
 
 
+def ebs(D, t, l):
+    """
+    Elastic buckling strength (MPa) of tanks of size D, t (1-D arrays,
+    mm) for ring frame spacings l (1-D array, or one row per tank, mm)
+    as an array of shape (n_tanks, n_spacings, 5), whose last axis is
+    for (a) to (e) load types in bcoeff_ebs()
+    """
+    D = np.asarray(D, float)[:, None]
+    t = np.asarray(t, float)[:, None]
+    return bcoeff_ebs(D, t, np.asarray(l, float))[1]
+
+
+def max_spacing(D, t, s, lmin=100.0, lmax=1.0e5, tol=1.0e-4):
+    """
+    Maximum distance between ring frames, l (mm), for tanks of size
+    D, t (1-D arrays, mm), for which elastic buckling strength meets
+    the stresses s (MPa) of all five load types, i.e., f_E >= s; s is
+    of shape (5,) or (n_tanks, 5), with zero for a load type absent.
+    f_E falls with l, so l is found by bisection (on log l, to tol)
+    for all tanks at once. Returns lmax where l >= lmax meets s, and
+    np.nan where even lmin does not.
+    """
+    D = np.asarray(D, float)
+    t = np.asarray(t, float)
+    s = np.asarray(s, float)
+
+    # Least reserve of f_E over s across load types
+    def g(l):
+        return np.min(bcoeff_ebs(D, t, l)[1] - s, axis=-1)
+
+    lo = np.full(D.shape, np.log(lmin))
+    hi = np.full(D.shape, np.log(lmax))
+    for i in range(int(np.ceil(np.log2((hi[0] - lo[0]) / tol)))):
+        x = 0.5 * (lo + hi)
+        ok = g(np.exp(x)) >= 0
+        lo = np.where(ok, x, lo)
+        hi = np.where(ok, hi, x)
+    l = np.exp(lo)
+    l = np.where(g(np.full(D.shape, lmax)) >= 0, lmax, l)
+    return np.where(g(np.full(D.shape, lmin)) >= 0, l, np.nan)
+
+
 def ebs_plot(D, t, l):
-    # Call only the C list (not used)
-    C = bcoeff_ebs(D, t, l)[0]
-    # Call only the f_E list
-    f_E = bcoeff_ebs(D, t, l)[1]
+    # Call only the f_E array, one column per load type
+    f_E = bcoeff_ebs(D, t, l)[1].T
     # Plot labels
     lbl = [
         "$f_{Ea}$ for axial stress",
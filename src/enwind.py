@@ -21,15 +21,20 @@ Options:
 import numpy as np
 import matplotlib.pyplot as plt
 from docopt import docopt
+import gk
 
 z0 = [0.003, 0.01, 0.05, 0.3, 1.0]  # m, Roughness length
 zmin = [1.0, 1.0, 2.0, 5.0, 10.] # m, reference length scale
 zt = 200. # m, reference height, Annex B.1
 Lt = 300. # m, reference length scale, Annex B.1
 rho = 1.25 # kg/m^3, air density, \S 4.5
+k1 = 1.0 # recommended turbulence factor, eq. 4.7
+c0 = 1.0 # orography factor for below 3deg gradient, \S 4.3.3
 
-args = docopt(__doc__, version='EN wind action plots, version: 0.1')
-h = float(args['--height'])
+# Per-terrain constants (terrain categories 0 -- IV), computed once
+tz0 = np.array(z0)
+tzmin = np.array(zmin)
+tkr = 0.19 * (tz0 / z0[2])**0.07 # terrain factor, eq. 4.5
 
 def misc():
     plt.legend(loc=0)
@@ -37,7 +42,7 @@ def misc():
     plt.ylabel('Height, z (m)')
     pass
 
-def tls():
+def tls(h):
     # Wind turbulence, Annex B, EN 1991-1-4:2005
     for i, j in zip(z0, zmin):
         alpha = 0.67 + 0.05 * np.log(i)
@@ -50,64 +55,130 @@ def tls():
     plt.savefig('tls.svg')
     pass
 
-def tr():
+def tr(h):
     # Terrain roughness, Clause 4.3.2, EN 1991-1-4:2005
-    for i, j in zip(z0, zmin):
+    for i, j in enumerate(zmin):
         z = np.linspace(j, h)
-        kr = 0.19 * (i / z0[2])**0.07
-        cr = kr * np.log(z / i)
-        plt.plot(cr, z, label='Terrain: %d' %(z0.index(i)),linewidth=2)
+        cr = tkr[i] * np.log(z / tz0[i])
+        plt.plot(cr, z, label='Terrain: %d' %i,linewidth=2)
     misc()
     plt.xlabel('Roughness factor, $c_r(z) = v_m(z) / v_b$')
     plt.savefig('rf.svg')
     pass
 
-def ti():
+def ti(h):
     # Turbulence intensity, \S 4.4, EN 1991-1-4:2005
-    for i, j in zip(z0, zmin):
+    for i, j in enumerate(zmin):
         z = np.linspace(j, h)
-        # recommended turbulence factor, eq. 4.7
-        k1 = 1.0
-        # orography factor for below 3deg gradient, \S 4.3.3
-        c0 = 1.0
         # turbulence intensity, \S 4.4
-        Iv = k1 / (c0 * np.log(z / i))
-        plt.plot(Iv, z, label='Terrain: %d' %(z0.index(i)),linewidth=2)
+        Iv = k1 / (c0 * np.log(z / tz0[i]))
+        plt.plot(Iv, z, label='Terrain: %d' %i,linewidth=2)
     misc()
     plt.xlabel('Turbulence intensity, $I_v(z)$')
     plt.savefig('ti.svg')
     pass
 
-def pvp():
+def pvp(h):
     # Peak velocity pressure, \S 4.5, EN 1991-1-4:2005
-    for i, j in zip(z0, zmin):
+    for i, j in enumerate(zmin):
         z = np.linspace(j, h)
-        kr = 0.19 * (i / z0[2])**0.07
-        cr = kr * np.log(z / i)
-        # recommended turbulence factor, eq. 4.7
-        k1 = 1.0
-        # orography factor for below 3deg gradient, \S 4.3.3
-        c0 = 1.0
-        # turbulence intensity, \S 4.4
-        Iv = k1 / (c0 * np.log(z / i))
         # in terms of vb
-        qp = (1.0 + 7.0 * Iv) * 0.5 * cr**2
-        plt.plot(qp, z, label='Terrain: %d' %(z0.index(i)),linewidth=2)
+        plt.plot(qp(z, i) / rho, z, label='Terrain: %d' %i,linewidth=2)
     misc()
     plt.xlabel('Peak velocity pressure $q_p(z)$ in terms of $v_b$')
     plt.savefig('pvp.svg')
     pass
 
+def qp(z, cat, vb=1.0):
+    # Peak velocity pressure (N/m^2), \S 4.5, at heights z (m) for
+    # terrain category (index) cat and basic wind velocity vb (m/s);
+    # z, cat and vb broadcast, and z is taken as zmin below zmin
+    z = np.maximum(z, tzmin[cat])
+    lz = np.log(z / tz0[cat])
+    # roughness factor, and turbulence intensity
+    cr = tkr[cat] * lz
+    Iv = k1 / (c0 * lz)
+    return (1.0 + 7.0 * Iv) * 0.5 * rho * vb**2 * cr**2
+
+def wind_force(p1, p2, b, cf, cat, vb, wd, n=3):
+    """
+    Wind force (N) on member segments from nodes p1 to p2 ((nseg, 3)
+    arrays, m, z up from ground / still water level) of width b (m)
+    and force coefficient cf, for wind directions wd (1-D, deg from
+    x-axis, towards which wind blows); b, cf, cat and vb are scalars
+    or per-segment (nseg,) arrays. qp is integrated along each
+    segment by n-point Gauss-Legendre rule, and applied normal to the
+    member (cross-flow principle). Zero-length segments carry no
+    load. Returns forces (nseg, ndir, 3), and their points of
+    application (nseg, 3).
+    """
+    p1 = np.asarray(p1, float)
+    p2 = np.asarray(p2, float)
+    d = p2 - p1
+    L = np.linalg.norm(d, axis=1)
+    # Zero-length segments: e = 0, and F = 0 through L
+    e = d / np.where(L > 0, L, 1.0)[:, None]
+    # Gauss points along each segment (0 -- 1), and qp at them
+    x, w = np.polynomial.legendre.leggauss(n)
+    s = 0.5 * (1 + x)
+    q = qp(
+        p1[:, 2:] + s * d[:, 2:],
+        np.asarray(cat)[..., None],
+        np.asarray(vb, float)[..., None],
+    )
+    # Mean qp along segment, and centre of pressure
+    qm = 0.5 * (q * w).sum(axis=1)
+    sc = (q * w * s).sum(axis=1) / (q * w).sum(axis=1)
+    pc = p1 + sc[:, None] * d
+    # Wind unit vectors, and their components normal to members
+    wd = np.radians(np.atleast_1d(wd))
+    u = np.stack([np.cos(wd), np.sin(wd), np.zeros_like(wd)], axis=1)
+    un = u[None] - (e @ u.T)[:, :, None] * e[:, None]
+    an = np.linalg.norm(un, axis=2)
+    F = (cf * b * L * qm)[:, None, None] * an[:, :, None] * un
+    return F, pc
+
+def base_loads(F, pc, o=(0.0, 0.0, 0.0)):
+    # Base shear (ndir, 3) and overturning moment (ndir, 3) about o
+    r = pc - np.asarray(o, float)
+    return F.sum(axis=0), np.cross(r[:, None], F).sum(axis=0)
+
+def shear(cat, vb, h, b=1.0, cf=1.0, tol=1e-6):
+    """
+    Base shear (N) and overturning moment (Nm) of vertical structures
+    of width b (m) and force coefficient cf from ground up to h (m),
+    for terrain categories cat and basic wind velocities vb (m/s); all
+    1-D arrays (or scalars) that broadcast. qp is integrated by
+    adaptive Gauss-Kronrod quadrature to tol (relative), with a break
+    at zmin of each terrain. Returns (V, M, V error, M error, neval).
+    """
+    cat, vb, h, b, cf = [
+        np.atleast_1d(i) for i in np.broadcast_arrays(cat, vb, h, b, cf)
+    ]
+    brk = tzmin[cat][:, None]
+
+    def fv(z, k):
+        return cf[k] * b[k] * qp(z, cat[k], vb[k])
+
+    def fm(z, k):
+        return fv(z, k) * z
+
+    V, eV, nV = gk.quad(fv, np.zeros_like(h, float), h, tol, brk)
+    M, eM, nM = gk.quad(fm, np.zeros_like(h, float), h, tol, brk)
+    return V, M, eV, eM, nV + nM
+
 def main():
+    args = docopt(__doc__, version='EN wind action plots, version: 0.1')
+    h = float(args['--height'])
     if h <= zt:
         if args['-p']:
-            pvp()
+            pvp(h)
         elif args['-l']:
-            tls()
+            tls(h)
         elif args['-r']:
-            tr()
+            tr(h)
         elif args['-i']:
-            ti()
+            ti(h)
         else:
             print("No option was selected. For help, try: python enwind.py -h")
     else:
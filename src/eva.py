@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Extreme value analysis of long hourly hindcast records (e.g., wind
+speed, or Hs) by annual maxima or declustered peaks over threshold,
+extracted in one streaming pass, and fitted to Weibull, Gumbel or GEV
+distributions, with bootstrap confidence intervals in parallel.
+2026 ckunte
+
+Usage: eva.py FILE [--dist=D] [--pot=U] [--sep=N] [--boot=B] [--jobs=N]
+                   [--chunk=N] [--seed=S]
+       eva.py --help
+       eva.py --version
+
+Options:
+  --help      Show this help screen
+  FILE        Hourly records (.csv with a header row, or structured
+              .npy) with columns: year, x
+  --dist=D    Distribution: weibull, gumbel, or gev [default: gumbel]
+  --pot=U     Peaks over threshold U (default: annual maxima)
+  --sep=N     Min. hours between independent peaks [default: 48]
+  --boot=B    Bootstrap resamples [default: 1000]
+  --jobs=N    Worker processes, 0 => all cores [default: 0]
+  --chunk=N   Records per chunk [default: 1000000]
+  --seed=S    Seed of the bootstrap random streams [default: 0]
+  --version   Show version.
+
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numpy as np
+from scipy import stats
+import matplotlib.pyplot as plt
+from docopt import docopt
+import wind_pdf
+
+# Distributions (scipy.stats) by name
+dists = {
+    "weibull": stats.weibull_min,
+    "gumbel": stats.gumbel_r,
+    "gev": stats.genextreme,
+}
+# Return periods (years) reported
+rp = np.array([10.0, 100.0, 1000.0, 10000.0])
+
+
+# READ HOURLY RECORDS IN CHUNKS
+def chunks(fn, n):
+    if fn.endswith(".npy"):
+        # Structured array, memory-mapped (nothing read until sliced)
+        a = np.load(fn, mmap_mode="r")
+        for i in range(0, a.shape[0], n):
+            yield np.asarray(a["year"][i : i + n]), np.asarray(
+                a["x"][i : i + n], float
+            )
+    else:
+        with open(fn) as f:
+            k = [i.strip() for i in f.readline().split(",")]
+            while True:
+                rows = list(islice(f, n))
+                if not rows:
+                    break
+                a = np.loadtxt(rows, delimiter=",", ndmin=2)
+                yield a[:, k.index("year")].astype(int), a[:, k.index("x")]
+    pass
+
+
+# ANNUAL MAXIMA (ONE PASS)
+def annual_maxima(fn, n=1000000):
+    am = {}
+    for yr, x in chunks(fn, n):
+        y, i = np.unique(yr, return_inverse=True)
+        m = np.full(len(y), -np.inf)
+        np.maximum.at(m, i, x)
+        for j, k in zip(y, m):
+            am[j] = max(am.get(j, -np.inf), k)
+    y = np.array(sorted(am))
+    return y, np.array([am[i] for i in y])
+
+
+# DECLUSTERED PEAKS OVER THRESHOLD (ONE PASS)
+def peaks(fn, u, sep=48, n=1000000):
+    """
+    Cluster maxima of records above u, where clusters are separated by
+    at least sep records (hours). The open cluster at the end of each
+    chunk is carried into the next. Returns peaks and years of record.
+    """
+    pk = []
+    # Open cluster: (record index of last exceedance, its maximum)
+    last, cmax = -np.inf, -np.inf
+    i0 = 0
+    yrs = set()
+    for yr, x in chunks(fn, n):
+        yrs.update(np.unique(yr).tolist())
+        idx = np.flatnonzero(x > u)
+        if len(idx):
+            gi = idx + i0
+            # Start of a new cluster (incl. the first, if far from open)
+            new = np.r_[gi[0] - last > sep, np.diff(gi) > sep]
+            s = np.flatnonzero(new)
+            m = np.maximum.reduceat(x[idx], s) if len(s) else []
+            # Close the open cluster, or merge the first run into it
+            if new[0]:
+                if np.isfinite(cmax):
+                    pk.append(cmax)
+            else:
+                cmax = max(cmax, x[idx][: s[0] if len(s) else None].max())
+                if len(s):
+                    pk.append(cmax)
+            if len(s):
+                pk.extend(m[:-1])
+                cmax = m[-1]
+            last = gi[-1]
+        i0 += len(x)
+    if np.isfinite(cmax):
+        pk.append(cmax)
+    return np.array(pk), len(yrs)
+
+
+# RETURN VALUES
+def return_values(dist, par, T, rate=1.0):
+    # rate => events (maxima or peaks) per year
+    return dists[dist].ppf(1.0 - 1.0 / (rate * T), *par)
+
+
+def fit(dist, x, rate=1.0, loc=0.0):
+    # Weibull is fitted with loc fixed, i.e., at 0 for annual maxima (as
+    # in wind_pdf.py), or at the threshold for peaks over threshold
+    kw = {"floc": loc} if dist == "weibull" else {}
+    par = dists[dist].fit(x, **kw)
+    return par, return_values(dist, par, rp, rate)
+
+
+def boot(dist, x, rate, loc, seed, nb):
+    # nb bootstrap resamples of x with an independent random stream
+    rng = np.random.default_rng(seed)
+    res = np.empty((nb, len(rp)))
+    for i in range(nb):
+        res[i] = fit(dist, rng.choice(x, len(x)), rate, loc)[1]
+    return res
+
+
+def bootstrap(
+    dist, x, rate=1.0, loc=0.0, nb=1000, jobs=None, seed=0, ci=0.9
+):
+    """
+    Confidence intervals (ci) of return values from nb bootstrap
+    resamples, split across a process pool, with independent random
+    streams spawned from seed. Returns (lower, upper) bounds.
+    """
+    nj = jobs or os.cpu_count()
+    ss = np.random.SeedSequence(seed).spawn(nj)
+    nb = [len(i) for i in np.array_split(np.arange(nb), nj)]
+    with ProcessPoolExecutor(max_workers=nj) as ex:
+        res = np.concatenate(
+            list(
+                ex.map(
+                    boot,
+                    [dist] * nj,
+                    [x] * nj,
+                    [rate] * nj,
+                    [loc] * nj,
+                    ss,
+                    nb,
+                )
+            )
+        )
+    a = 0.5 * (1.0 - ci)
+    return np.quantile(res, [a, 1.0 - a], axis=0)
+
+
+def main():
+    args = docopt(__doc__, version="Extreme value analysis, v0.1")
+    dist = args["--dist"]
+    n = int(args["--chunk"])
+    if args["--pot"]:
+        u, sep = float(args["--pot"]), int(args["--sep"])
+        x, ny = peaks(args["FILE"], u, sep, n)
+        rate, loc = len(x) / ny, u
+    else:
+        x = annual_maxima(args["FILE"], n)[1]
+        rate, loc = 1.0, 0.0
+    par, xT = fit(dist, x, rate, loc)
+    lo, hi = bootstrap(
+        dist,
+        x,
+        rate,
+        loc,
+        int(args["--boot"]),
+        int(args["--jobs"]) or None,
+        int(args["--seed"]),
+    )
+    print("%s fit of %d events (%.2f per year):" % (dist, len(x), rate), par)
+    for i, j, k, l in zip(rp, xT, lo, hi):
+        print("%7.0f-y: %.2f (90%% CI: %.2f -- %.2f)" % (i, j, k, l))
+    # Weibull fit of annual maxima => pdf plot of speed normalised by
+    # its 100-y value
+    if dist == "weibull" and not args["--pot"]:
+        c, loc, s = par
+        wind_pdf.plot(c, [s / xT[list(rp).index(100.0)]], [], "pdf-eva.svg")
+        plt.close()
+    pass
+
+
+if __name__ == "__main__":
+    main()
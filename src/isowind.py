@@ -14,9 +14,74 @@ Options:
   --height=H  Maximum height (m). [default: 140.0]
 
 """
+from functools import lru_cache
 import numpy as np
 import matplotlib.pyplot as plt
 from docopt import docopt
+import gk
+
+zr = 10.0 # m, ref. height
+t0 = 3600.0 # s (=> 1h)
+rho = 1.225 # kg/m^3, air density
+
+@lru_cache(maxsize=None)
+def coeffs(Uo):
+    # Per-speed coefficients for 1h mean wind speed Uo at zr (m/s):
+    # turbulence intensity at zr, and C (for zr = 10m)
+    Iu = 0.06 * (1 + 0.043 * Uo)
+    C = 0.0573 * (1 + 0.15 * Uo)**(0.5)
+    return Iu, C
+
+def profile(Uo, Iu, C, t, z):
+    # Wind speed u(z, t) (m/s) from 1h mean wind speed Uo at zr and its
+    # coefficients (Iu, C); all broadcast
+    Iuz = Iu * (z / zr)**(-0.22)
+    Uz = Uo * (1 + C * np.log(z / zr))
+    return Uz * (1 - 0.41 * Iuz * np.log(t / t0))
+
+def gust(Uo, t, z):
+    """
+    Wind speed u(z, t) (m/s) as an array of shape (len(Uo), len(t),
+    len(z)) for 1h mean wind speeds Uo at zr (m/s), averaging times
+    t (s) and heights z (m), all 1-D. Coefficients for each speed are
+    cached, as speeds recur across load cases.
+    """
+    Uo = np.atleast_1d(np.asarray(Uo, float))
+    t = np.atleast_1d(np.asarray(t, float))[None, :, None]
+    z = np.atleast_1d(np.asarray(z, float))[None, None, :]
+    # Coefficients of unique speeds, mapped back to all speeds
+    Us, k = np.unique(Uo, return_inverse=True)
+    Iu, C = np.array([coeffs(float(i)) for i in Us]).T[:, k, None, None]
+    return profile(Uo[:, None, None], Iu, C, t, z)
+
+def shear(Uo, t, h, b=1.0, cf=1.0, zmin=1.0, tol=1e-6):
+    """
+    Base shear (N) and overturning moment (Nm) of vertical structures
+    of width b (m) and force coefficient cf, from still water level
+    up to h (m), for 1h mean wind speeds Uo at zr (m/s) and averaging
+    times t (s); all 1-D arrays (or scalars) that broadcast. Below
+    zmin (m), u is held at u(zmin), where the log profile no longer
+    applies. 0.5 rho u^2 is integrated by adaptive Gauss-Kronrod
+    quadrature to tol (relative), with a break at zmin. Returns (V,
+    M, V error, M error, neval).
+    """
+    Uo, t, h, b, cf, zmin = [
+        np.atleast_1d(i).astype(float)
+        for i in np.broadcast_arrays(Uo, t, h, b, cf, zmin)
+    ]
+    Iu, C = np.array([coeffs(float(i)) for i in Uo]).T
+
+    def fv(z, k):
+        z = np.maximum(z, zmin[k])
+        u = profile(Uo[k], Iu[k], C[k], t[k], z)
+        return cf[k] * b[k] * 0.5 * rho * u**2
+
+    def fm(z, k):
+        return fv(z, k) * z
+
+    V, eV, nV = gk.quad(fv, np.zeros_like(h), h, tol, zmin[:, None])
+    M, eM, nM = gk.quad(fm, np.zeros_like(h), h, tol, zmin[:, None])
+    return V, M, eV, eM, nV + nM
 
 def main():
     args = docopt(
@@ -27,19 +92,13 @@ def main():
     h = float(args['--height']) # m, max. height (e.g., a flare tower)
 
     t = [3., 5., 60., 600., 3600.] # in seconds
-    t0 = 3600.0 # s (=> 1h)
 
-    zr = 10.0 # m, ref. height
     z = np.linspace(0.1, h)
+    u = gust(Uo, t, z)[0]
 
-    Iuz = 0.06 * (1 + 0.043 * Uo) * (z / zr)**(-0.22)
-    C = 0.0573 * (1 + 0.15 * Uo)**(0.5) # for zr = 10m
-    Uz = Uo * (1 + C * np.log(z / zr))
-
-    for i in t:
-        u = Uz * (1 - 0.41 * Iuz * np.log(i / t0))
+    for i, j in zip(t, u):
         lbl = 'u(z,t) -- %0.0fs' %i
-        plt.plot(u, z, label=lbl, linewidth=2)
+        plt.plot(j, z, label=lbl, linewidth=2)
 
     # ref: https://goo.gl/CJgoyu
     plt.title(
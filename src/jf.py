@@ -8,8 +8,13 @@ or (b) as a case of accidental flooding (e.g., due to pressure loss
 from, say, leaks, diaphragm rupture, faulty/damaged seal etc). 
 2021 ckunte
 """
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy import sparse
+from scipy.integrate import solve_ivp
 
 """
 Legend:
@@ -19,8 +24,14 @@ Legend:
   Ar -- Area of orifice (= np.pi * D**2 / 4.0)
   mu -- Frictional coefficient
   V -- Volume of the flood-able compartment (m^3)
+  H -- Height of the flood-able compartment (m)
 """
 
+# Acceleration due to gravity (m/s^2)
+g = 9.81
+# Seawater density (kg/m^3)
+rho = 1025.0
+
 # Velocity of water ingress
 def velo(h, mu):
     return mu * np.sqrt(2.0 * g * h)
@@ -54,7 +65,7 @@ def plot_DvQ(D, Q):
 
 
 # Main function: plot D (orifice dia.) versus t (time taken to flood)
-def plot_Dvt(D, t, V, vol_lbl):
+def plot_Dvt(D, t, V, vol_lbl, fn="Dvt.svg"):
     for i, j, k in zip(t, vol_lbl, V):
         plt.semilogy(D, i, label=j + " (%.0f$m^3$)" % (k))
         pass
@@ -62,7 +73,7 @@ def plot_Dvt(D, t, V, vol_lbl):
     plt.legend(loc=0)
     plt.xlabel("Hole diameter, D (m)")
     plt.ylabel("Time taken to flood, t (hour)")
-    plt.savefig("Dvt.svg")
+    plt.savefig(fn)
     plt.close()
     pass
 
@@ -74,6 +85,158 @@ def time2flood(V, Q):
     return (V_arr[:, None] / Q_arr) / 3600.0
 
 
+# Orifice diameter (m) to flood volumes V in times t (hours), i.e.,
+# the inverse of time2flood(), of shape (V, t)
+def diameter(V, t, v):
+    Q = np.asarray(V, float)[:, None] / (np.asarray(t, float) * 3600.0)
+    return np.sqrt(4.0 * (Q / v) / np.pi)
+
+
+def size(V, t, Ap, B, mu, avail=None, tol=0.1):
+    """
+    Orifice diameters (m) to flood compartments V in target times t
+    (hours), both of shape (V, t). If available hole sizes avail (m)
+    are given, each is snapped to the nearest one (in time to flood,
+    which goes as 1 / D^2), and returned with its time to flood, where
+    nan marks those more than tol (relative) off the target time.
+    Returns (D, Da, ta), with Da and ta all nan if avail is None.
+    """
+    v = velo(head(Ap, B), mu)
+    D = diameter(V, t, v)
+    if avail is None:
+        return D, np.full_like(D, np.nan), np.full_like(D, np.nan)
+    a = np.sort(np.asarray(avail, float))
+    i = np.clip(np.searchsorted(a, D), 1, len(a) - 1)
+    lo, hi = a[i - 1], a[i]
+    Da = np.where(np.log(D / lo) <= np.log(hi / D), lo, hi)
+    ta = np.asarray(V, float)[:, None] / flowrate(v, Da) / 3600.0
+    bad = np.abs(ta / np.asarray(t, float) - 1.0) > tol
+    return D, np.where(bad, np.nan, Da), np.where(bad, np.nan, ta)
+
+
+# Signed flow through an orifice of area A for a head difference dh,
+# linear below h0 (m) to keep flow smooth as levels equalise
+def orifice(A, dh, mu, h0=1e-3):
+    r = np.maximum(np.abs(dh), h0)
+    return A * velo(r, mu) * dh / r
+
+
+# Time-domain flooding of compartments (in hours)
+def flood(V, D, Ap, B, mu=0.75, H=None, Dc=None, smax=10.0, n=400):
+    """
+    Flood compartments V (nc) through holes D (ns, nc; m, 0 => none)
+    in ns scenarios (e.g., hole sizes) at once, where head(Ap, B) falls
+    as buoyancy B is lost to flooded volume, and, if heights H (nc) are
+    given, water levels inside (flooded volume over plan area V / H)
+    reduce the head across holes. Compartments may be interconnected
+    through orifices of diameter Dc (nc, nc; sparse, upper triangle),
+    with flow driven by the difference in their water levels. A full
+    compartment takes no more water.
+
+    Each scenario runs on its own time scale, viz., its longest time
+    to flood at the initial head, so that all scenarios are integrated
+    together in one call to 0 -- smax times that scale. Returns times
+    (ns, n) and flooded volumes (ns, nc, n), and times to flood (ns,
+    nc) in hours (inf => not within smax time scales).
+    """
+    V = np.asarray(V, float)
+    Ar = np.pi * np.square(np.asarray(D, float).reshape(-1, len(V))) / 4.0
+    ns, nc = Ar.shape
+    As = V / np.asarray(H, float) if H is not None else np.full(nc, np.inf)
+    # Connections (i, j, area), and incidence of flow from i to j
+    Dc = sparse.triu(sparse.coo_matrix((nc, nc) if Dc is None else Dc), 1)
+    Dc = Dc.tocoo()
+    e = np.arange(Dc.nnz)
+    M = sparse.csr_matrix(
+        (np.r_[-np.ones(Dc.nnz), np.ones(Dc.nnz)], (np.r_[e, e], np.r_[
+            Dc.row, Dc.col])),
+        shape=(Dc.nnz, nc),
+    )
+    Ac = np.pi * np.square(Dc.data) / 4.0
+    # Time scale (s) per scenario
+    Q0 = flowrate(velo(head(Ap, B), mu), np.sqrt(4.0 * Ar / np.pi))
+    T = np.max(np.where(Q0 > 0, V / np.where(Q0 > 0, Q0, 1.0), 0.0), 1)
+    T = np.where(T > 0, T, 1.0)
+
+    def rhs(s, y):
+        y = y.reshape(ns, nc)
+        # Head outside (falls with buoyancy), and levels inside
+        hx = head(Ap, np.maximum(B - rho * g * y.sum(1), 0.0))[:, None]
+        lv = y / As
+        dh = hx - lv
+        q = orifice(Ar, dh, mu)
+        # Flow between connected compartments (i => j, if positive)
+        dl = lv[:, Dc.row] - lv[:, Dc.col]
+        qc = orifice(Ac, dl, mu)
+        q = q + (M.T @ qc.T).T
+        q = np.where((y >= V) & (q > 0), 0.0, q)
+        return (T[:, None] * q).ravel()
+
+    s = np.linspace(0.0, smax, n)
+    sol = solve_ivp(
+        rhs,
+        (0.0, smax),
+        np.zeros(ns * nc),
+        method="BDF",
+        t_eval=s,
+        dense_output=True,
+        jac_sparsity=sparse.kron(sparse.eye(ns), np.ones((nc, nc))),
+        rtol=1e-9,
+        atol=1e-12,
+    )
+    vol = np.minimum(sol.y.reshape(ns, nc, n), V[:, None])
+    # Time to flood: first crossing of V, bracketed by outputs, and
+    # then bisected on the dense solution
+    full = vol >= V[:, None] * (1.0 - 1e-9)
+    j = np.flatnonzero(full.any(2))
+    i = np.argmax(full, axis=2).ravel()[j]
+    lo, hi = s[np.maximum(i - 1, 0)], s[i]
+    Vj = np.tile(V, ns)[j]
+    for _ in range(50 if len(j) else 0):
+        m = 0.5 * (lo + hi)
+        up = sol.sol(m)[j, np.arange(len(j))] >= Vj
+        lo, hi = np.where(up, lo, m), np.where(up, m, hi)
+    tf = np.full(ns * nc, np.inf)
+    tf[j] = hi * np.repeat(T, nc)[j]
+    return T[:, None] * s / 3600.0, vol, tf.reshape(ns, nc) / 3600.0
+
+
+# Random samples of uncertain inputs, e.g., dist = {"mu": ("uniform",
+# (0.6, 0.8))}, where names and parameters are of numpy Generator
+# methods; inputs not in dist are fixed at their values in x
+def sample(rng, n, dist, **x):
+    for k, (i, j) in dist.items():
+        x[k] = getattr(rng, i)(*j, size=n)
+    return x
+
+
+# Monte Carlo: counts of times to flood within target times tt (hours)
+def mc_chunk(V, Ap, B, dist, tt, n, seed, D=0.01, mu=0.75):
+    x = sample(np.random.default_rng(seed), n, dist, D=D, mu=mu, B=B)
+    h = head(Ap, np.maximum(x["B"], 0.0))
+    Q = flowrate(velo(h, np.maximum(x["mu"], 0.0)), np.abs(x["D"]))
+    t = time2flood(V, np.broadcast_to(Q, (n,)))
+    return (t[:, None, :] <= np.asarray(tt)[:, None]).sum(2)
+
+
+def montecarlo(V, Ap, B, dist, tt, D=0.01, mu=0.75, N=10 ** 7,
+               chunk=10 ** 6, jobs=None, seed=0):
+    """
+    Probabilities (compartments, tt) that compartments V flood within
+    target times tt (hours), from N samples of uncertain inputs (D, mu,
+    and B) per dist (see sample()), with the rest fixed. Samples are
+    drawn and counted in chunks across a process pool, with a random
+    stream spawned from seed per chunk, so that memory is set by chunk
+    (not N), and results do not depend on jobs.
+    """
+    n = [chunk] * (N // chunk) + ([N % chunk] if N % chunk else [])
+    ss = np.random.SeedSequence(seed).spawn(len(n))
+    f = partial(mc_chunk, V, Ap, B, dist, tt, D=D, mu=mu)
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as ex:
+        c = sum(ex.map(f, n, ss))
+    return c / N
+
+
 def style():
     # plt.legend(loc=0)
     plt.rcParams["grid.linestyle"] = ":"
@@ -99,12 +262,23 @@ if __name__ == "__main__":
     Ap = 5400.0
     # Hole diameter (mm)
     D = np.arange(1.0, 100.0)
-    # Acceleration due to gravity (m/s^2)
-    g = 9.81
-    # Seawater density (kg/m^3)
-    rho = 1025.0
     # Assumed, Table 1-9, Handbook of hydraulic resistance
     mu = 0.75
+    # Accidental flooding: uncertain inputs (numpy Generator methods
+    # and their parameters), viz., hole diameter (m), mu, and B (N)
+    dist = {
+        "D": ("lognormal", (np.log(10e-3), 0.75)),
+        "mu": ("uniform", (0.6, 0.8)),
+        "B": ("normal", (B, 0.05 * B)),
+    }
+    # Target times (hours), and no. of samples
+    tt = [1.0, 6.0, 24.0, 48.0, 168.0]
+    N = 10 ** 7
+    # Engineered flooding: target times (hours), available hole sizes
+    # (mm), and tolerance on time to flood
+    td = [2.0, 4.0, 8.0]
+    avail = [25.0, 32.0, 40.0, 50.0, 65.0, 80.0, 100.0, 125.0, 150.0]
+    tol = 0.25
     # --- END of USER INPUTS ---
     D = conv(D)
     h = head(Ap, B)
@@ -112,4 +286,21 @@ if __name__ == "__main__":
     Q = flowrate(v, D)
     t = time2flood(V, Q)
     plot_DvQ(D, Q)
-    plot_Dvt(D, t, V, vol_lbl)
\ No newline at end of file
+    plot_Dvt(D, t, V, vol_lbl)
+    # Time-domain flooding, where head falls as buoyancy is lost, of
+    # each compartment alone (inf => buoyancy is lost before it floods)
+    nc = len(V)
+    Dh = (np.array(D)[:, None, None] * np.eye(nc)).reshape(-1, nc)
+    tf = flood(V, Dh, Ap, B, mu)[2].reshape(-1, nc, nc)
+    plot_Dvt(D, tf.diagonal(0, 1, 2).T, V, vol_lbl, "Dvt-td.svg")
+    # Orifice sizes for engineered flooding (nan => none available)
+    Ds, Da, ta = size(V, td, Ap, B, mu, conv(avail), tol)
+    print("D (mm) to flood in %s h; available D (mm), t (h)" % td)
+    for i, j in enumerate(vol_lbl):
+        print("%s: %s; %s, %s" % (
+            j, np.round(Ds[i] * 1e3), Da[i] * 1e3, np.round(ta[i], 1)))
+    # Probabilities of flooding within target times
+    pf = montecarlo(V, Ap, B, dist, tt, mu=mu, N=N)
+    print("P(t <= %s h)" % ", ".join("%g" % i for i in tt))
+    for i, j in zip(vol_lbl, pf):
+        print("%s: %s" % (i, ", ".join("%.2e" % k for k in j)))
\ No newline at end of file
@@ -4,7 +4,8 @@
 of inertia forces, bending and shear stresses. 
 2020 ckunte
 
-Usage: ptow-ls.py (--fb | --fv) [--tr=T1] [--tp=T2]
+Usage: ptow-ls.py [--fb] [--fv] [--tr=T1] [--tp=T2]
+       ptow-ls.py --grid [--out=F] [--tr=T1] [--tp=T2]
        ptow-ls.py --help
        ptow-ls.py --version
 
@@ -14,18 +15,25 @@ Options:
   --fv        Plot shear stresses in pile during tow
   --tr=T1     Single amplitude roll period (s) [default: 10.]
   --tp=T2     Single amplitude pitch period (s) [default: 10.]
+  --grid      Compute (overhang, roll, pitch, Tr, Tp) response surface,
+              save it, and plot its contours at --tr and --tp
+  --out=F     Response surface file (.npz) [default: ptow-ls.npz]
   --version   Show version.
 
 """
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.interpolate import RegularGridInterpolator
 from docopt import docopt
 
-args = docopt(
-    __doc__,
-    version="Influence of overhung pile length on stresses from specific motions, v1.0.0",
-)
-# -- BEGIN USER INPUTS --
+# Acceleration due to gravity (m/s^2)
+g = 9.81
+
+# Axes (in order) of a response surface from surface()
+saxes = ("Lp", "r", "p", "Tr", "Tp")
+# Labels (in order) of the leading axis of a response surface
+slbl = ("fbr", "fbp", "fvr", "fvp")
+
 # -------------------------------------------------------------------
 #            Lp
 #     |<-------------->|
@@ -43,7 +51,7 @@ args = docopt(
 #   ><>
 # -------------------------------------------------------------------
 # COMPUTE INERTIA FORCES PER UNIT WEIGHT
-def inertia(r, p):
+def inertia(r, p, Tr, Tp, L, h=0.20):
     # r and p to be in radians
     r = r * (np.pi / 180.0)
     p = p * (np.pi / 180.0)
@@ -67,20 +75,29 @@ def inertia(r, p):
     return Fr, Fvr, Fhr, Fp, Fvp, Fhp, Fq
 
 
-# COMPUTE BENDING STRESSES
-def bending_stress(r, p):
-    # Call results of inertia(r, p) function and multiply each value
-    # of the tuple by an LRFD factor of 1.485 (= 1.1 * 1.35)
-    F = map(lambda x: x * 1.485, inertia(r, p))
+# FACTORED INERTIA FORCES AND SECTION PROPERTIES
+def tow_loads(r, p, D, t, Tr, Tp, L, h=0.20):
+    # Stack results of inertia(r, p) function into one array and
+    # multiply it in place by an LRFD factor of 1.485 (= 1.1 * 1.35)
+    F = np.array(np.broadcast_arrays(*inertia(r, p, Tr, Tp, L, h)))
+    F *= 1.485
     # Call results of pipe_secprop(D, t) function
     s = pipe_secprop(D, t)
+    # Share (F, s) between bending_stress() and shear_stress()
+    return F, s
+
+
+# COMPUTE BENDING STRESSES
+def bending_stress(r, p, D, t, Lp, Tr, Tp, L, h=0.20, loads=None):
+    F, s = loads if loads else tow_loads(r, p, D, t, Tr, Tp, L, h)
     # For pile section overhung behind vessel stern (cantilever moment)
     # Bending stress (MPa) fb = M / Z, where M = (w * l) * l
-    fbvr = ((s[2] * F[1]) * Lp ** 2) / s[1]
-    fbhr = ((s[2] * F[2]) * Lp ** 2) / s[1]
+    k = (s[2] * Lp ** 2) / s[1]
+    fbvr = k * F[1]
+    fbhr = k * F[2]
     fbr = np.sqrt(fbvr ** 2 + fbhr ** 2)
-    fbvp = ((s[2] * F[4]) * Lp ** 2) / s[1]
-    fbhp = ((s[2] * F[5]) * Lp ** 2) / s[1]
+    fbvp = k * F[4]
+    fbhp = k * F[5]
     fbp = np.sqrt(fbvp ** 2 + fbhp ** 2)
     # where, F[1] => Fvr; F[2] => Fhr; F[4] => Fvp; F[5] => Fhp, and
     # where, s[1] => Ze
@@ -88,16 +105,16 @@ def bending_stress(r, p):
 
 
 # COMPUTE SHEAR STRESSES
-def shear_stress(r, p):
-    F = map(lambda x: x * 1.485, inertia(r, p))
-    s = pipe_secprop(D, t)
+def shear_stress(r, p, D, t, Lp, Tr, Tp, L, h=0.20, loads=None):
+    F, s = loads if loads else tow_loads(r, p, D, t, Tr, Tp, L, h)
     # For pile section overhung behind vessel stern
     # Shear stress (MPa) fv = 2V / A, where V = (w * l)
-    fvvr = (2.0 * ((s[2] * F[1]) * Lp)) / s[0]
-    fvhr = (2.0 * ((s[2] * F[2]) * Lp)) / s[0]
+    k = (2.0 * s[2] * Lp) / s[0]
+    fvvr = k * F[1]
+    fvhr = k * F[2]
     fvr = np.sqrt(fvvr ** 2 + fvhr ** 2)
-    fvvp = (2.0 * ((s[2] * F[4]) * Lp)) / s[0]
-    fvhp = (2.0 * ((s[2] * F[5]) * Lp)) / s[0]
+    fvvp = k * F[4]
+    fvhp = k * F[5]
     fvp = np.sqrt(fvvp ** 2 + fvhp ** 2)
     # where, s[0] => A
     return fvr, fvvr, fvhr, fvp, fvvp, fvhp
@@ -124,6 +141,91 @@ def pipe_secprop(D, t):
     return A, Ze, w
 
 
+# RESPONSE SURFACE OVER (OVERHANG, ROLL, PITCH, TR, TP)
+def surface(D, t, Lp, r, p, Tr, Tp, Ly, Lz, Ls=80.0, h=0.20):
+    """
+    Bending and shear stresses (MPa) of a pile (D, t) for every
+    combination of 1-D arrays of overhang Lp, roll r, pitch p and
+    their periods Tr, Tp, in one pass. The pile C.O.G. is at Lp / 2
+    beyond the stern, which is at Ls from vessel C.O.R. Returns a
+    dict of axes (saxes) and a float32 array, S, of shape (4, nLp,
+    nr, np, nTr, nTp), whose leading axis is labelled by slbl.
+    """
+    sf = dict(zip(saxes, map(np.atleast_1d, (Lp, r, p, Tr, Tp))))
+    # Open grid: each axis along its own dimension
+    Lp, r, p, Tr, Tp = np.ix_(*sf.values())
+    shape = tuple(len(i) for i in sf.values())
+    S = np.empty((len(slbl),) + shape, dtype=np.float32)
+    F = inertia(r, p, Tr, Tp, [Ls + 0.5 * Lp, Ly, Lz], h)
+    A, Ze, w = pipe_secprop(D, t)
+    # fb = 1.485 * (w / Ze) * Lp^2 * F, and fv = 1.485 * (2w / A) * Lp * F
+    S[0] = 1.485 * (w / Ze) * Lp ** 2 * F[0]
+    S[1] = 1.485 * (w / Ze) * Lp ** 2 * F[3]
+    S[2] = 1.485 * (2.0 * w / A) * Lp * F[0]
+    S[3] = 1.485 * (2.0 * w / A) * Lp * F[3]
+    sf["S"] = S
+    return sf
+
+
+# SAVE / LOAD A RESPONSE SURFACE
+def save_surface(fn, sf):
+    np.savez(fn, **sf)
+    pass
+
+
+def load_surface(fn):
+    with np.load(fn) as f:
+        return {i: f[i] for i in saxes + ("S",)}
+
+
+# SLICE A RESPONSE SURFACE AT (NEAREST) AXIS VALUES
+def section(sf, name, **fixed):
+    # e.g., section(sf, "fbr", p=10.0, Tr=10.0, Tp=10.0) => (nLp, nr)
+    idx = [
+        np.abs(sf[i] - fixed[i]).argmin() if i in fixed else slice(None)
+        for i in saxes
+    ]
+    return sf["S"][(slbl.index(name),) + tuple(idx)]
+
+
+# INTERPOLATE A RESPONSE SURFACE AT ANY POINTS
+def query(sf, name, Lp, r, p, Tr, Tp):
+    # Multilinear interpolation; inputs broadcast against each other.
+    # Axes of length 1 are treated as fixed (no interpolation).
+    x = np.broadcast_arrays(Lp, r, p, Tr, Tp)
+    keep = [len(sf[i]) > 1 for i in saxes]
+    f = RegularGridInterpolator(
+        [sf[i] for i, k in zip(saxes, keep) if k],
+        sf["S"][slbl.index(name)].squeeze(
+            axis=tuple(i for i, k in enumerate(keep) if not k)
+        ),
+    )
+    pts = np.stack([i for i, k in zip(x, keep) if k], axis=-1)
+    return f(pts)
+
+
+# PLOT RESPONSE SURFACE CONTOURS
+def plot_surface(sf, name, x, y, fn, **fixed):
+    # Filled contours of name over axes x and y (see saxes), sliced
+    # at nearest values of all the remaining (fixed) axes
+    z = section(sf, name, **fixed)
+    if saxes.index(x) < saxes.index(y):
+        z = z.T
+    cs = plt.contourf(sf[x], sf[y], z, 20)
+    plt.colorbar(cs, label="%s (MPa)" % name)
+    # Section bending strength (396 MPa) for bending stresses
+    if name.startswith("fb"):
+        plt.contour(sf[x], sf[y], z, [396.0], colors="r")
+    plt.xlabel(x)
+    plt.ylabel(y)
+    plt.title(
+        ", ".join("%s=%.1f" % (i, j) for i, j in fixed.items())
+    )
+    plt.savefig(fn)
+    plt.close()
+    pass
+
+
 # PLOT FUNCTIONS
 def misc():
     # plt.xlabel('Motion angle (deg)')
@@ -134,8 +236,7 @@ def misc():
 
 
 # PLOT PILE LENGTH v. BENDING STRESS (ROLL)
-def plot_roll_motion_bendingstress(r, p):
-    fb = bending_stress(r, p)
+def plot_roll_motion_bendingstress(Lp, fb):
     plt.plot(
         Lp,
         fb[0],
@@ -153,8 +254,7 @@ def plot_roll_motion_bendingstress(r, p):
 
 
 # PLOT PILE LENGTH v. BENDING STRESS (PITCH)
-def plot_pitch_motion_bendingstress(r, p):
-    fb = bending_stress(r, p)
+def plot_pitch_motion_bendingstress(Lp, fb):
     plt.plot(
         Lp,
         fb[3],
@@ -172,8 +272,7 @@ def plot_pitch_motion_bendingstress(r, p):
 
 
 # PLOT PILE LENGTH v. SHEAR STRESS (ROLL)
-def plot_roll_motion_shearstress(r, p):
-    fv = shear_stress(r, p)
+def plot_roll_motion_shearstress(Lp, fv):
     plt.plot(
         Lp,
         fv[0],
@@ -190,8 +289,7 @@ def plot_roll_motion_shearstress(r, p):
 
 
 # PLOT PILE LENGTH v. SHEAR STRESS (PITCH)
-def plot_pitch_motion_shearstress(r, p):
-    fv = shear_stress(r, p)
+def plot_pitch_motion_shearstress(Lp, fv):
     plt.plot(
         Lp,
         fv[3],
@@ -208,8 +306,11 @@ def plot_pitch_motion_shearstress(r, p):
 
 
 def main():
+    args = docopt(
+        __doc__,
+        version="Influence of overhung pile length on stresses from specific motions, v1.0.0",
+    )
     # -- BEGIN USER INPUTS --
-    g = 9.81  # Acceleration due to gravity (m/s^2)
     """
     Cargo location w.r.t vessel:
     Lever arm (x, y, z) between vessel C.O.R to overhung pile C.O.G (m):
@@ -227,18 +328,42 @@ def main():
     Tp = float(args["--tp"])  # Full cycle period: pitch (default: 10s)
     h = 0.20  # Heave amplitude (h) in terms of g
     # -- END USER INPUTS --
-    if args["--fb"]:
-        plot_roll_motion_bendingstress(r, p)
-        plot_pitch_motion_bendingstress(r, p)
-    elif args["--fv"]:
-        plot_roll_motion_shearstress(r, p)
-        plot_pitch_motion_shearstress(r, p)
-    else:
+    if args["--grid"]:
+        sf = surface(
+            D,
+            t,
+            np.linspace(0, 40.0, 41),  # overhang (m)
+            np.linspace(0, 35.0, 36),  # roll (deg)
+            np.linspace(0, 20.0, 21),  # pitch (deg)
+            np.linspace(6.0, 16.0, 6),  # roll period (s)
+            np.linspace(6.0, 16.0, 6),  # pitch period (s)
+            L[1],
+            L[2],
+            80.0,
+            h,
+        )
+        save_surface(args["--out"], sf)
+        fn = ["pp-fb-roll-grid.png", "pp-fb-pitch-grid.png"]
+        plot_surface(sf, "fbr", "Lp", "r", fn[0], p=p, Tr=Tr, Tp=Tp)
+        plot_surface(sf, "fbp", "Lp", "p", fn[1], r=r, Tr=Tr, Tp=Tp)
+        return
+    if not (args["--fb"] or args["--fv"]):
         print(
             "Please select plot option. Try: python ptow-ls.py --help"
         )
+        return
+    # Factored inertia forces and section properties (computed once)
+    loads = tow_loads(r, p, D, t, Tr, Tp, L, h)
+    if args["--fb"]:
+        fb = bending_stress(r, p, D, t, Lp, Tr, Tp, L, h, loads)
+        plot_roll_motion_bendingstress(Lp, fb)
+        plot_pitch_motion_bendingstress(Lp, fb)
+    if args["--fv"]:
+        fv = shear_stress(r, p, D, t, Lp, Tr, Tp, L, h, loads)
+        plot_roll_motion_shearstress(Lp, fv)
+        plot_pitch_motion_shearstress(Lp, fv)
     pass
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,7 +4,8 @@
 of inertia forces, bending and shear stresses. 
 2020 ckunte
 
-Usage: ptow.py (--iner | --fb | --fv) [--tr=T1] [--tp=T2]
+Usage: ptow.py [--iner] [--fb] [--fv] [--tr=T1] [--tp=T2]
+       ptow.py --csv=F [--out=F] [--chunk=N] [--jobs=N] [--tr=T1] [--tp=T2]
        ptow.py --help
        ptow.py --version
 
@@ -15,17 +16,38 @@ Options:
   --fv        Plot shear stresses in pile during tow
   --tr=T1     Single amplitude roll period (s) [default: 10.]
   --tp=T2     Single amplitude pitch period (s) [default: 10.]
+  --csv=F     Screen piles listed in a CSV manifest (columns: D, t, Lp,
+              Lx, Ly, Lz) against Noble Denton vessel classes
+  --out=F     Results file (.csv or .parquet) [default: ptow.csv]
+  --chunk=N   Piles per chunk (batch mode) [default: 1000]
+  --jobs=N    Worker processes (batch mode), 0 => all cores [default: 0]
   --version   Show version.
 
 """
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import matplotlib.pyplot as plt
 from docopt import docopt
+import ves
 
-args = docopt(
-    __doc__,
-    version="Influence of vessel motions on transported piles, v1.0.0",
+# Acceleration due to gravity (m/s^2)
+g = 9.81
+
+# Labels (in order) of the leading axis of the result tensor from screen()
+lbl = (
+    "Fr", "Fvr", "Fhr", "Fp", "Fvp", "Fhp", "Fq",
+    "fbr", "fbvr", "fbhr", "fbp", "fbvp", "fbhp",
+    "fvr", "fvvr", "fvhr", "fvp", "fvvp", "fvhp",
 )
+
+# Vessel classes per Noble Denton 0030/ND: roll, pitch (deg), title
+vc = ves.vc
+
+# Results written per pile and vessel class in batch mode
+cols = ("Fr", "Fp", "Fq", "fbr", "fbp", "fvr", "fvp")
+
 # -------------------------------------------------------------------
 #            Lp
 #     |<-------------->|
@@ -64,7 +86,7 @@ def pipe_secprop(D, t):
 
 
 # COMPUTE INERTIA FORCES PER UNIT WEIGHT
-def inertia(r, p):
+def inertia(r, p, Tr, Tp, L, h=0.20):
     # r and p to be in radians
     r = r * (np.pi / 180.0)
     p = p * (np.pi / 180.0)
@@ -88,21 +110,29 @@ def inertia(r, p):
     return Fr, Fvr, Fhr, Fp, Fvp, Fhp, Fq
 
 
-# COMPUTE BENDING STRESSES
-def bending_stress(r, p):
-    # Call results of inertia(r, p) function and multiply each value
-    # of the tuple by an LRFD factor of 1.485 (= 1.1 * 1.35)
-    # F = map(lambda x: x * 1.485, inertia(r, p)) # python2
-    F = list(map(lambda x: x * 1.485, inertia(r, p)))  # for python3
+# FACTORED INERTIA FORCES AND SECTION PROPERTIES
+def tow_loads(r, p, D, t, Tr, Tp, L, h=0.20):
+    # Stack results of inertia(r, p) function into one array and
+    # multiply it in place by an LRFD factor of 1.485 (= 1.1 * 1.35)
+    F = np.array(np.broadcast_arrays(*inertia(r, p, Tr, Tp, L, h)))
+    F *= 1.485
     # Call results of pipe_secprop(D, t) function
     s = pipe_secprop(D, t)
+    # Share (F, s) between bending_stress() and shear_stress()
+    return F, s
+
+
+# COMPUTE BENDING STRESSES
+def bending_stress(r, p, D, t, Lp, Tr, Tp, L, h=0.20, loads=None):
+    F, s = loads if loads else tow_loads(r, p, D, t, Tr, Tp, L, h)
     # For pile section overhung behind vessel stern (cantilever moment)
     # Bending stress (MPa) fb = M / Z, where M = (w * l) * l
-    fbvr = ((s[2] * F[1]) * Lp ** 2) / s[1]
-    fbhr = ((s[2] * F[2]) * Lp ** 2) / s[1]
+    k = (s[2] * Lp ** 2) / s[1]
+    fbvr = k * F[1]
+    fbhr = k * F[2]
     fbr = np.sqrt(fbvr ** 2 + fbhr ** 2)
-    fbvp = ((s[2] * F[4]) * Lp ** 2) / s[1]
-    fbhp = ((s[2] * F[5]) * Lp ** 2) / s[1]
+    fbvp = k * F[4]
+    fbhp = k * F[5]
     fbp = np.sqrt(fbvp ** 2 + fbhp ** 2)
     # where, F[1] => Fvr; F[2] => Fhr; F[4] => Fvp; F[5] => Fhp, and
     # where, s[1] => Ze; s[2] => w
@@ -110,22 +140,212 @@ def bending_stress(r, p):
 
 
 # COMPUTE SHEAR STRESSES
-def shear_stress(r, p):
-    # F = map(lambda x: x * 1.485, inertia(r, p)) # python2
-    F = list(map(lambda x: x * 1.485, inertia(r, p)))  # for python3
-    s = pipe_secprop(D, t)
+def shear_stress(r, p, D, t, Lp, Tr, Tp, L, h=0.20, loads=None):
+    F, s = loads if loads else tow_loads(r, p, D, t, Tr, Tp, L, h)
     # For pile section overhung behind vessel stern
     # Shear stress (MPa) fv = 2V / A, where V = (w * l)
-    fvvr = (2.0 * ((s[2] * F[1]) * Lp)) / s[0]
-    fvhr = (2.0 * ((s[2] * F[2]) * Lp)) / s[0]
+    k = (2.0 * s[2] * Lp) / s[0]
+    fvvr = k * F[1]
+    fvhr = k * F[2]
     fvr = np.sqrt(fvvr ** 2 + fvhr ** 2)
-    fvvp = (2.0 * ((s[2] * F[4]) * Lp)) / s[0]
-    fvhp = (2.0 * ((s[2] * F[5]) * Lp)) / s[0]
+    fvvp = k * F[4]
+    fvhp = k * F[5]
     fvp = np.sqrt(fvvp ** 2 + fvhp ** 2)
     # where, s[0] => A
     return fvr, fvvr, fvhr, fvp, fvvp, fvhp
 
 
+# SCREEN PILES FOR A SET OF MOTIONS (BATCH)
+def screen(D, t, Lp, r, p, Tr, Tp, Lx, Ly, Lz, h=0.20, dtype=np.float64):
+    """
+    Inertia forces, bending and shear stresses for any combination
+    of piles (D, t, Lp), motions (r, p, Tr, Tp, h) and lever arms
+    (Lx, Ly, Lz) in one pass. Inputs are scalars or arrays that
+    broadcast against each other, e.g., D[:, None] against r[None, :].
+    Returns a result tensor of shape (19,) + broadcast shape, whose
+    leading axis is labelled by lbl, e.g., res[lbl.index("fbr")].
+    """
+    shape = np.broadcast_shapes(
+        *map(np.shape, (D, t, Lp, r, p, Tr, Tp, Lx, Ly, Lz, h))
+    )
+    res = np.empty((len(lbl),) + shape, dtype=dtype)
+    # Unfactored inertia forces (evaluated on motion axes only)
+    F = inertia(r, p, Tr, Tp, (Lx, Ly, Lz), h)
+    for i in range(7):
+        res[i] = F[i]
+    # Section properties (evaluated on pile axes only)
+    A, Ze, w = pipe_secprop(D, t)
+    # LRFD factor of 1.485 (= 1.1 * 1.35) folded into pile constants,
+    # so that fb = kb * F, and fv = kv * F
+    kb = 1.485 * w * Lp ** 2 / Ze
+    kv = 1.485 * 2.0 * w * Lp / A
+    # Bending (7--12) and shear (13--18) stresses from Fv and Fh
+    # (res[j, ...] stays an array view, also for scalar inputs)
+    for i, k in ((7, kb), (13, kv)):
+        np.multiply(k, res[1, ...], out=res[i + 1, ...])
+        np.multiply(k, res[2, ...], out=res[i + 2, ...])
+        np.hypot(res[i + 1, ...], res[i + 2, ...], out=res[i, ...])
+        np.multiply(k, res[4, ...], out=res[i + 4, ...])
+        np.multiply(k, res[5, ...], out=res[i + 5, ...])
+        np.hypot(res[i + 4, ...], res[i + 5, ...], out=res[i + 3, ...])
+    return res
+
+
+# MAXIMUM OVERHANG FOR A GOVERNING INERTIA FORCE
+def overhang(D, t, F, fba=396.0, fva=np.inf):
+    # F is the (unfactored) governing resultant inertia force, and
+    # fba, fva are allowable bending and shear stresses (MPa)
+    A, Ze, w = pipe_secprop(D, t)
+    # fb = 1.485 * F * (w / Ze) * Lp^2, and fv = 1.485 * F * (2w / A) * Lp
+    Lb = np.sqrt(fba / (1.485 * F * w / Ze))
+    Lv = fva / (1.485 * F * 2.0 * w / A)
+    return np.minimum(Lb, Lv)
+
+
+# MAXIMUM OVERHANG FOR A SET OF MOTIONS
+def max_overhang(D, t, r, p, Tr, Tp, L, h=0.20, fba=396.0, fva=np.inf):
+    # Stresses are proportional to Lp^2 (bending) and Lp (shear), so
+    # the maximum overhang is in closed form for all piles and motions
+    F = inertia(r, p, Tr, Tp, L, h)
+    # Governing of roll (Fr) and pitch (Fp) resultants
+    return overhang(D, t, np.maximum(F[0], F[3]), fba, fva)
+
+
+# VECTORIZED BISECTION
+def bisect(f, lo, hi, tol=1e-6):
+    # Root of f(x) = 0 for arrays of brackets [lo, hi], each of which
+    # is to contain one sign change; all brackets are halved together,
+    # and the final brackets (lo, hi), within tol, are returned so the
+    # caller can pick the side it needs
+    flo = f(np.asarray(lo, float))
+    lo, hi, flo = np.broadcast_arrays(lo, hi, flo)
+    lo, hi, flo = np.array(lo, float), np.array(hi, float), flo.copy()
+    n = int(np.ceil(np.log2(np.max(hi - lo) / tol)))
+    for i in range(max(n, 0)):
+        x = 0.5 * (lo + hi)
+        fx = f(x)
+        left = np.signbit(fx) == np.signbit(flo)
+        lo = np.where(left, x, lo)
+        flo = np.where(left, fx, flo)
+        hi = np.where(left, hi, x)
+    return lo, hi
+
+
+# MINIMUM PILE DIAMETER FOR A SET OF MOTIONS
+def min_diameter(
+    t, Lp, r, p, Tr, Tp, L, h=0.20, fba=396.0, fva=np.inf, Dmax=10.0
+):
+    """
+    Smallest diameter D (m) of a pile with wall thickness t, over-
+    hung by Lp, that keeps bending and shear stresses within fba
+    and fva (MPa) for each motion case. Self-weight stresses vary
+    only weakly with t (and fv not at all), so it is D that sizes
+    the section. Returns np.nan where no D <= Dmax suffices.
+    """
+    F = inertia(r, p, Tr, Tp, L, h)
+    F = np.maximum(F[0], F[3])
+
+    # Bending stress less allowable; decreases with D
+    def fb(D):
+        A, Ze, w = pipe_secprop(D, t)
+        return 1.485 * F * (w / Ze) * Lp ** 2 - fba
+
+    # Shear stress, fv = 1.485 * F * (2 * 0.077) * Lp, is free of D
+    fv = 1.485 * F * 2.0 * 0.077 * Lp
+    lo = 2.0 * np.asarray(t, float) + 1e-6
+    # fb decreases with D, so hi is the end of the bracket that passes
+    D = bisect(fb, lo, Dmax)[1]
+    D = np.where(fb(lo) <= 0, lo, D)
+    return np.where((fb(Dmax) > 0) | (fv > fva), np.nan, D)
+
+
+# READ PILE MANIFEST
+def read_manifest(fn):
+    # CSV with a header row and one row per pile, with columns:
+    # D, t, Lp (m) and lever arms Lx, Ly, Lz (m) from vessel C.O.R
+    m = np.genfromtxt(fn, delimiter=",", names=True, dtype=float)
+    return np.atleast_1d(m)
+
+
+# SCREEN A CHUNK OF PILES AGAINST ALL VESSEL CLASSES
+def screen_chunk(m, Tr, Tp, h=0.20):
+    # Vessel classes run along the last axis, piles along the first
+    r = np.array([i[0] for i in vc.values()])
+    p = np.array([i[1] for i in vc.values()])
+    pile = [m[i][:, None] for i in ("D", "t", "Lp", "Lx", "Ly", "Lz")]
+    res = screen(*pile[:3], r, p, Tr, Tp, *pile[3:], h)
+    # Keep only the columns written to file, shape: (cols, piles, vc)
+    return res[[lbl.index(i) for i in cols]]
+
+
+# TABULATE A CHUNK OF SCREENING RESULTS
+def chunk_table(m, res, fba, fva=205.0):
+    # One row per pile and vessel class (pile-major order)
+    n, k = res.shape[1:]
+    pile = np.repeat(m, k)
+    data = {
+        "vessel": np.tile(list(vc), n),
+        **{i: pile[i] for i in m.dtype.names},
+        **{i: j.ravel() for i, j in zip(cols, res)},
+    }
+    # Bending and shear stress checks against section bending and
+    # shear (fy / sqrt(3)) strengths (MPa)
+    data["ok"] = (np.maximum(data["fbr"], data["fbp"]) < fba) & (
+        np.maximum(data["fvr"], data["fvp"]) < fva
+    )
+    # Maximum overhang for the same checks (for procurement lists)
+    F = np.maximum(data["Fr"], data["Fp"])
+    data["Lpmax"] = overhang(data["D"], data["t"], F, fba, fva)
+    return data
+
+
+# SCREEN A PILE MANIFEST (BATCH)
+def batch(fn, out, Tr, Tp, h=0.20, chunk=1000, jobs=None, fba=396.0,
+          fva=205.0):
+    # The manifest (one row per pile) is read whole; results are not
+    m = read_manifest(fn)
+    chunks = [m[i : i + chunk] for i in range(0, len(m), chunk)]
+    nj = jobs or os.cpu_count()
+    parquet = out.endswith(".parquet")
+    if parquet:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Requires pyarrow: run pip install pyarrow")
+        f = None
+    else:
+        f = open(out, "w")
+    # Results are written in order, chunk by chunk, with at most 2 x
+    # jobs chunks in flight, so that results held in memory are bounded
+    # by (2 x jobs x chunk) piles
+    with ProcessPoolExecutor(max_workers=nj) as ex:
+        q = deque()
+        for k, c in enumerate(chunks):
+            q.append((c, ex.submit(screen_chunk, c, Tr, Tp, h)))
+            # Write the oldest once the window is full, and the rest at
+            # the end
+            while len(q) >= 2 * nj or (q and k == len(chunks) - 1):
+                i, j = q.popleft()
+                data = chunk_table(i, j.result(), fba, fva)
+                if parquet:
+                    t = pa.table(data)
+                    f = f or pq.ParquetWriter(out, t.schema)
+                    f.write_table(t)
+                else:
+                    if f.tell() == 0:
+                        f.write(",".join(data) + "\n")
+                    np.savetxt(
+                        f,
+                        np.column_stack(list(data.values())).astype(object),
+                        fmt="%s",
+                        delimiter=",",
+                    )
+    if f:
+        f.close()
+    pass
+
+
 # PLOT FUNCTIONS
 def misc():
     plt.xlabel("Motion angle (deg)")
@@ -135,8 +355,7 @@ def misc():
 
 
 # PLOT MOTION v. INERTIA FORCE (ROLL)
-def plot_roll_motion_inertia(r, p):
-    F = inertia(r, p)
+def plot_roll_motion_inertia(r, F):
     plt.plot(
         r,
         F[0],
@@ -153,8 +372,7 @@ def plot_roll_motion_inertia(r, p):
 
 
 # PLOT MOTION v. INERTIA FORCE (PITCH)
-def plot_pitch_motion_inertia(r, p):
-    F = inertia(r, p)
+def plot_pitch_motion_inertia(p, F):
     plt.plot(
         p,
         F[3],
@@ -171,8 +389,7 @@ def plot_pitch_motion_inertia(r, p):
 
 
 # PLOT MOTION v. BENDING STRESS (ROLL)
-def plot_roll_motion_bendingstress(r, p):
-    fb = bending_stress(r, p)
+def plot_roll_motion_bendingstress(r, fb, D, t, Lp):
     plt.plot(
         r,
         fb[0],
@@ -196,8 +413,7 @@ def plot_roll_motion_bendingstress(r, p):
 
 
 # PLOT MOTION v. BENDING STRESS (PITCH)
-def plot_pitch_motion_bendingstress(r, p):
-    fb = bending_stress(r, p)
+def plot_pitch_motion_bendingstress(p, fb, D, t, Lp):
     plt.plot(
         p,
         fb[3],
@@ -219,8 +435,7 @@ def plot_pitch_motion_bendingstress(r, p):
 
 
 # PLOT MOTION v. SHEAR STRESS (ROLL)
-def plot_roll_motion_shearstress(r, p):
-    fv = shear_stress(r, p)
+def plot_roll_motion_shearstress(r, fv, D, t, Lp):
     plt.plot(
         r,
         fv[0],
@@ -241,8 +456,7 @@ def plot_roll_motion_shearstress(r, p):
 
 
 # PLOT MOTION v. SHEAR STRESS (PITCH)
-def plot_pitch_motion_shearstress(r, p):
-    fv = shear_stress(r, p)
+def plot_pitch_motion_shearstress(p, fv, D, t, Lp):
     plt.plot(
         p,
         fv[3],
@@ -263,8 +477,11 @@ def plot_pitch_motion_shearstress(r, p):
 
 
 def main():
+    args = docopt(
+        __doc__,
+        version="Influence of vessel motions on transported piles, v1.0.0",
+    )
     # -- BEGIN USER INPUTS --
-    g = 9.81  # Acceleration due to gravity (m/s^2)
     # Cargo location w.r.t vessel:
     # Lever arm (x, y, z) between vessel C.O.R to overhung pile C.O.G (m):
     L = [95.00, 20.00, 15.25]
@@ -279,20 +496,38 @@ def main():
     Tp = float(args["--tp"])  # Full cycle period: pitch (default: 10s)
     h = 0.20  # Heave amplitude (h) in terms of g
     # -- END USER INPUTS --
-    # process option
-    if args["--iner"]:
-        plot_roll_motion_inertia(r, p)
-        plot_pitch_motion_inertia(r, p)
-    elif args["--fb"]:
-        plot_roll_motion_bendingstress(r, p)
-        plot_pitch_motion_bendingstress(r, p)
-    elif args["--fv"]:
-        plot_roll_motion_shearstress(r, p)
-        plot_pitch_motion_shearstress(r, p)
-    else:
+    # batch mode
+    if args["--csv"]:
+        batch(
+            args["--csv"],
+            args["--out"],
+            Tr,
+            Tp,
+            h,
+            int(args["--chunk"]),
+            int(args["--jobs"]) or None,
+        )
+        return
+    # process option(s)
+    if not (args["--iner"] or args["--fb"] or args["--fv"]):
         print("Please select plot option. Try: python ptow.py --help")
+        return
+    # Factored inertia forces and section properties (computed once)
+    if args["--fb"] or args["--fv"]:
+        loads = tow_loads(r, p, D, t, Tr, Tp, L, h)
+    if args["--iner"]:
+        F = inertia(r, p, Tr, Tp, L, h)
+        plot_roll_motion_inertia(r, F)
+        plot_pitch_motion_inertia(p, F)
+    if args["--fb"]:
+        fb = bending_stress(r, p, D, t, Lp, Tr, Tp, L, h, loads)
+        plot_roll_motion_bendingstress(r, fb, D, t, Lp)
+        plot_pitch_motion_bendingstress(p, fb, D, t, Lp)
+    if args["--fv"]:
+        fv = shear_stress(r, p, D, t, Lp, Tr, Tp, L, h, loads)
+        plot_roll_motion_shearstress(r, fv, D, t, Lp)
+        plot_pitch_motion_shearstress(p, fv, D, t, Lp)
     pass
 
-
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Vessel motions from motion RAOs and wave spectra (JONSWAP or
+Pierson-Moskowitz) over a Hs-Tp scatter diagram and headings, as
+equivalent single amplitude motions for ptow.py and ves.py.
+2026 ckunte
+
+Usage: rao.py --rao=F [--gamma=G] [--dur=T]
+       rao.py --help
+       rao.py --version
+
+Options:
+  --help      Show this help screen
+  --rao=F     RAO table (.npz) with arrays: w (rad/s), hd (deg), and
+              roll, pitch (deg/m), heave (m/m) each of shape (hd, w)
+  --gamma=G   JONSWAP peak enhancement factor, 1 => PM [default: 3.3]
+  --dur=T     Storm duration for most probable maxima (h) [default: 3.]
+  --version   Show version.
+
+"""
+import numpy as np
+import matplotlib.pyplot as plt
+from docopt import docopt
+
+# Acceleration due to gravity (m/s^2)
+g = 9.81
+
+# Degrees of freedom (in order) of an RAO table
+dof = ("roll", "pitch", "heave")
+
+
+# WAVE SPECTRUM (JONSWAP; PIERSON-MOSKOWITZ FOR gamma = 1)
+def jonswap(w, Hs, Tp, gamma=3.3):
+    # Spectral density (m^2 s/rad) at w (rad/s), DNV-RP-C205, 3.5.5;
+    # Hs and Tp broadcast against w, e.g., Hs[:, None] and w[None, :]
+    wp = 2.0 * np.pi / Tp
+    # Pierson-Moskowitz spectrum
+    S = (5.0 / 16.0) * Hs ** 2 * wp ** 4 * w ** -5.0
+    S = S * np.exp(-1.25 * (w / wp) ** -4.0)
+    # Spectral width parameter
+    sigma = np.where(w <= wp, 0.07, 0.09)
+    # Normalising factor (keeps Hs)
+    Ag = 1.0 - 0.287 * np.log(gamma)
+    a = np.exp(-0.5 * ((w - wp) / (sigma * wp)) ** 2)
+    return Ag * S * gamma ** a
+
+
+def pm(w, Hs, Tp):
+    return jonswap(w, Hs, Tp, 1.0)
+
+
+# SPECTRAL MOMENTS OF RESPONSE
+def moments(w, S, rao, n=(0, 2, 4)):
+    """
+    Moments of response spectra, |RAO|^2 * S, for all pairs of wave
+    spectra S (sea states, w) and RAOs (headings, w), as a list of
+    arrays of shape (sea states, headings). The trapezoidal rule over
+    w is applied as weights, so that each moment is one matrix product.
+    """
+    # Trapezoidal weights on w
+    q = np.zeros_like(w)
+    q[1:] += 0.5 * np.diff(w)
+    q[:-1] += 0.5 * np.diff(w)
+    R = np.abs(rao) ** 2 * q
+    return [S @ (R * w ** i).T for i in n]
+
+
+# MOTIONS FOR A SCATTER DIAGRAM AND HEADINGS
+def motions(w, rao, Hs, Tp, gamma=3.3, dur=3.0):
+    """
+    Significant and most probable maximum (MPM) motions, and their
+    accelerations, for sea states (Hs, Tp: 1-D arrays) and headings
+    of an RAO table, where rao is a dict of arrays of shape
+    (headings, w) for each of dof. Results are arrays of shape
+    (sea states, headings), and include the equivalent single
+    amplitude motions of ptow.inertia(), i.e., r, p (deg), Tr, Tp
+    (s) and h (in terms of g), based on MPM values in dur (h).
+    """
+    # Wave spectra of shape (sea states, w)
+    S = jonswap(w, np.asarray(Hs)[:, None], np.asarray(Tp)[:, None], gamma)
+    res = {}
+    for i in dof:
+        m0, m2, m4 = moments(w, S, rao[i])
+        # Zero up-crossing period (s) of response
+        Tz = 2.0 * np.pi * np.sqrt(m0 / np.where(m2 > 0, m2, np.inf))
+        # MPM factor for Rayleigh distributed amplitudes in dur
+        N = dur * 3600.0 / np.where(Tz > 0, Tz, np.inf)
+        k = np.sqrt(2.0 * np.log(np.maximum(N, 1.0)))
+        # Significant (2 sqrt(m0)) and MPM motion and acceleration
+        res[i + "_s"] = 2.0 * np.sqrt(m0)
+        res[i + "_mpm"] = k * np.sqrt(m0)
+        res[i + "_acc_s"] = 2.0 * np.sqrt(m4)
+        res[i + "_acc_mpm"] = k * np.sqrt(m4)
+    # Equivalent single amplitude motions, such that in ptow.inertia()
+    # angle * (2 pi / T)^2 returns the MPM angular acceleration
+    for i, j in (("r", "roll"), ("p", "pitch")):
+        a, b = res[j + "_mpm"], res[j + "_acc_mpm"]
+        res[i] = a
+        res["T" + i] = np.where(
+            b > 0, 2.0 * np.pi * np.sqrt(a / np.where(b > 0, b, 1.0)), np.inf
+        )
+    res["h"] = res["heave_acc_mpm"] / g
+    return res
+
+
+# READ RAO TABLE
+def read_rao(fn):
+    with np.load(fn) as f:
+        return f["w"], f["hd"], {i: f[i] for i in dof}
+
+
+def main():
+    args = docopt(
+        __doc__, version="Vessel motions from RAOs and wave spectra, v0.1"
+    )
+    w, hd, rao = read_rao(args["--rao"])
+    # -- BEGIN USER INPUTS --
+    # Scatter diagram: significant wave heights (m), peak periods (s)
+    Hs = np.array([2.0, 4.0, 6.0])
+    Tp = np.linspace(5.0, 18.0, 27)
+    # -- END USER INPUTS --
+    Hs, Tp = [i.ravel() for i in np.meshgrid(Hs, Tp, indexing="ij")]
+    gamma, dur = float(args["--gamma"]), float(args["--dur"])
+    res = motions(w, rao, Hs, Tp, gamma, dur)
+    # Plot MPM roll and pitch (governing heading) against Tp
+    for i, j in (("r", "roll"), ("p", "pitch")):
+        for k in np.unique(Hs):
+            x = Hs == k
+            plt.plot(Tp[x], res[i][x].max(axis=1), label="Hs=%.1fm" % k)
+        plt.xlabel("Peak period, $T_p$ (s)")
+        plt.ylabel("MPM %s (deg)" % j)
+        plt.legend(loc=0)
+        plt.grid(True)
+        plt.savefig("rao-%s.png" % j)
+        plt.close()
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -5,25 +5,33 @@ Load and resistance probability density and safety margins as per
 ISO 19902:2007
 rel_pdf.py -- 2018 ckunte
 """
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from scipy.stats import norm
 import numpy as np
 import matplotlib.pyplot as plt
 
+
+# Lognormal parameters (mu, sigma) from mean and covariance
+def lnpar(m, V):
+    return np.log(m / np.sqrt(1 + V ** 2)), np.sqrt(np.log(1 + V ** 2))
+
+
 # Function for plotting probability density by region
 
 
-def pd(exp, reg, Em, Ve, Rm, Vr):
-    mu_e = np.log(Em / np.sqrt(1 + Ve ** 2))  # mean
-    mu_r = np.log(Rm / np.sqrt(1 + Vr ** 2))  # mean
-    sigma_e = np.sqrt(np.log(1 + Ve ** 2))
-    sigma_r = np.sqrt(np.log(1 + Vr ** 2))
-    s_e = np.random.lognormal(mu_e, sigma_e, 1000)
-    s_r = np.random.lognormal(mu_r, sigma_r, 1000)
+def pd(exp, reg, Em, Ve, Rm, Vr, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    mu_e, sigma_e = lnpar(Em, Ve)
+    mu_r, sigma_r = lnpar(Rm, Vr)
+    s_e = rng.lognormal(mu_e, sigma_e, 1000)
+    s_r = rng.lognormal(mu_r, sigma_r, 1000)
     count_e, bins_e, ignored_e = plt.hist(
-        s_e, 100, normed=True, align="mid", alpha=0.09, color="r"
+        s_e, 100, density=True, align="mid", alpha=0.09, color="r"
     )
     count_r, bins_r, ignored_r = plt.hist(
-        s_r, 100, normed=True, align="mid", alpha=0.09, color="g"
+        s_r, 100, density=True, align="mid", alpha=0.09, color="g"
     )
     x_e = np.linspace(min(bins_e), max(bins_e), 10000)
     x_r = np.linspace(min(bins_r), max(bins_r), 10000)
@@ -53,6 +61,126 @@ def pd(exp, reg, Em, Ve, Rm, Vr):
     pass
 
 
+# Limit state, ln(R) - ln(E), for standard normal variables u (n, 2)
+def margin(u, Em, Ve, Rm, Vr):
+    mu_e, sigma_e = lnpar(Em, Ve)
+    mu_r, sigma_r = lnpar(Rm, Vr)
+    return (mu_r + sigma_r * u[..., 1]) - (mu_e + sigma_e * u[..., 0])
+
+
+# Exact Pf and reliability index (beta) of lognormal load and resistance
+def exact(Em, Ve, Rm, Vr):
+    mu_e, sigma_e = lnpar(Em, Ve)
+    mu_r, sigma_r = lnpar(Rm, Vr)
+    beta = (mu_r - mu_e) / np.sqrt(sigma_e ** 2 + sigma_r ** 2)
+    return norm.cdf(-beta), beta
+
+
+# Monte Carlo: failures (g <= 0) in n samples of d standard normals
+def count(g, d, n, seed):
+    rng = np.random.default_rng(seed)
+    return int(np.count_nonzero(g(rng.standard_normal((n, d))) <= 0))
+
+
+def montecarlo(g, d, cov=0.1, chunk=10 ** 6, nmax=10 ** 9, jobs=None, seed=0,
+               ci=0.95):
+    """
+    Probability of failure (g <= 0) of a limit state g(u) of d standard
+    normal variables u (n, d), by crude Monte Carlo in chunks across a
+    process pool, where each chunk draws from its own random stream
+    spawned from seed. Rounds of chunks (one per worker) run until the
+    CoV of Pf is within cov, or nmax samples, so that memory is set by
+    chunk. Returns Pf, beta, its ci confidence interval, and samples.
+    """
+    nj = jobs or os.cpu_count()
+    ss = np.random.SeedSequence(seed)
+    N = nf = 0
+    with ProcessPoolExecutor(max_workers=nj) as ex:
+        while N < nmax:
+            nf += sum(ex.map(count, [g] * nj, [d] * nj, [chunk] * nj,
+                             ss.spawn(nj)))
+            N += nj * chunk
+            if nf and np.sqrt((1.0 - nf / N) / nf) <= cov:
+                break
+    pf = nf / N
+    h = norm.ppf(0.5 + 0.5 * ci) * np.sqrt(pf * (1.0 - pf) / N)
+    return pf, -norm.ppf(pf), (max(pf - h, 0.0), pf + h), N
+
+
+# Design point (FORM, HL-RF iterations) of a limit state g(u)
+def design_point(g, d, tol=1e-6, maxiter=100, h=1e-6):
+    u = np.zeros(d)
+    for _ in range(maxiter):
+        # g and its gradient (forward differences) in one call
+        y = g(u + np.vstack([np.zeros(d), h * np.eye(d)]))
+        G = (y[1:] - y[0]) / h
+        un = ((G @ u - y[0]) / (G @ G)) * G
+        if np.linalg.norm(un - u) <= tol:
+            return un
+        u = un
+    return u
+
+
+def importance(g, d, cov=0.1, n=1000, nmax=10 ** 6, seed=0, u0=None):
+    """
+    Pf of a limit state g(u), as in montecarlo(), by importance
+    sampling from unit normals centred at the design point u0 (FORM,
+    if not given), in batches of n until the CoV of Pf is within cov,
+    or nmax samples. Returns Pf, beta, CoV, and samples.
+    """
+    u0 = design_point(g, d) if u0 is None else np.asarray(u0, float)
+    rng = np.random.default_rng(seed)
+    s = s2 = 0.0
+    N = 0
+    while N < nmax:
+        u = u0 + rng.standard_normal((n, d))
+        # Failures weighted by the ratio of the two densities
+        w = (g(u) <= 0) * np.exp(0.5 * (u0 @ u0) - u @ u0)
+        s, s2, N = s + w.sum(), s2 + (w ** 2).sum(), N + n
+        pf = s / N
+        c = np.sqrt(max(s2 / N - pf ** 2, 0.0) / N) / pf if pf else np.inf
+        if c <= cov:
+            break
+    return pf, -norm.ppf(pf), c, N
+
+
+def subset(g, d, n=1000, p0=0.1, rho=0.8, maxlevel=20, seed=0):
+    """
+    Pf of a limit state g(u), as in montecarlo(), by subset simulation
+    with n samples per level, where the p0 fraction closest to failure
+    seeds Markov chains (conditional sampling, with correlation rho)
+    for the next level, all chains advanced together. Returns Pf, beta,
+    CoV (of independent levels, i.e., a lower bound), and samples.
+    """
+    rng = np.random.default_rng(seed)
+    u = rng.standard_normal((n, d))
+    y = g(u)
+    N = n
+    nc = int(p0 * n)
+    pf, c2 = 1.0, 0.0
+    for _ in range(maxlevel):
+        o = np.argsort(y)
+        b = 0.5 * (y[o[nc - 1]] + y[o[nc]])
+        if b <= 0:
+            break
+        pf, c2 = pf * p0, c2 + (1 - p0) / (p0 * n)
+        # Chains from the seeds, conditional on g <= b
+        u, y = u[o[:nc]], y[o[:nc]]
+        us, ys = [u], [y]
+        for _ in range(n // nc - 1):
+            v = rho * u + np.sqrt(1 - rho ** 2) * rng.standard_normal(u.shape)
+            yv = g(v)
+            a = yv <= b
+            u, y = np.where(a[:, None], v, u), np.where(a, yv, y)
+            us.append(u)
+            ys.append(y)
+        N += nc * (n // nc - 1)
+        u, y = np.concatenate(us), np.concatenate(ys)
+    p = np.mean(y <= 0)
+    pf, c2 = pf * p, c2 + ((1 - p) / (p * len(y)) if p else np.inf)
+    return pf, -norm.ppf(pf), np.sqrt(c2), N
+
+
 """
 Legend:
 
@@ -73,16 +201,37 @@ where, for CNS and SNS, NNS, GOM, AUS:
 """
 
 
+# (exp, reg, Em, Ve, Rm, Vr)
+cases = [
+    ("L1", "GoM", 0.79, 0.3298, 1.85, 0.05),
+    ("L2", "GoM", 0.79, 0.3298, 1.60, 0.05),
+    ("L1", "NNS", 0.81, 0.2768, 1.92, 0.05),
+    ("L2", "NNS", 0.81, 0.2768, 1.49, 0.05),
+    ("L1", "CNS", 0.84, 0.2266, 1.73, 0.05),
+    ("L2", "CNS", 0.84, 0.2266, 1.40, 0.05),
+    ("L1", "AUS", 0.78, 0.3396, 2.18, 0.05),
+    ("L2", "AUS", 0.78, 0.3396, 1.60, 0.05),
+]
+
+
 def main():
-    # pd(exp, reg, Em, Ve, Rm, Vr)
-    pd("L1", "GoM", 0.79, 0.3298, 1.85, 0.05)
-    pd("L2", "GoM", 0.79, 0.3298, 1.60, 0.05)
-    pd("L1", "NNS", 0.81, 0.2768, 1.92, 0.05)
-    pd("L2", "NNS", 0.81, 0.2768, 1.49, 0.05)
-    pd("L1", "CNS", 0.84, 0.2266, 1.73, 0.05)
-    pd("L2", "CNS", 0.84, 0.2266, 1.40, 0.05)
-    pd("L1", "AUS", 0.78, 0.3396, 2.18, 0.05)
-    pd("L2", "AUS", 0.78, 0.3396, 1.60, 0.05)
+    rng = np.random.default_rng(0)
+    for i in cases:
+        pd(*i, rng=rng)
+    # Pf (per year) by Monte Carlo to a CoV of 5%
+    for i, (exp, reg, Em, Ve, Rm, Vr) in enumerate(cases):
+        g = partial(margin, Em=Em, Ve=Ve, Rm=Rm, Vr=Vr)
+        pf, beta, (lo, hi), N = montecarlo(g, 2, cov=0.05, seed=i)
+        print(
+            "%s - %s: Pf = %.2e (95%% CI: %.2e -- %.2e), beta = %.2f, "
+            "N = %.0e; exact Pf = %.2e" % (
+                reg, exp, pf, lo, hi, beta, N, exact(Em, Ve, Rm, Vr)[0])
+        )
+        # Variance reduction: importance sampling, and subset simulation
+        for j, k in (("IS", importance), ("SuS", subset)):
+            pf, beta, c, N = k(g, 2, seed=i)
+            print("  %s: Pf = %.2e (CoV %.2f), beta = %.2f, N = %d" % (
+                j, pf, c, beta, N))
     pass
 
 
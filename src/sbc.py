@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Buckling check of un-stiffened circular cylindrical shell panels
+for stresses exported from FE analysis, based on DNVGL-RP-C202 (2019).
+The export is read in chunks, so that memory stays flat regardless of
+its size, and only the governing load case per panel is written.
+2026 ckunte
+
+Usage: sbc.py FILE [--out=F] [--fy=S] [--chunk=N] [--lateral]
+       sbc.py --help
+       sbc.py --version
+
+Options:
+  --help      Show this help screen
+  FILE        Stress export (.csv with a header row, or structured
+              .npy) with columns: panel, lc, D, t, l (mm), and sa, sm,
+              tau, sh (MPa; tension positive)
+  --out=F     Governing results per panel (.csv) [default: sbc.csv]
+  --fy=S      Yield strength (MPa) [default: 355.]
+  --chunk=N   Rows per chunk [default: 1000000]
+  --lateral   Use f_E for lateral (instead of hydrostatic) pressure
+  --version   Show version.
+
+"""
+from itertools import islice
+import numpy as np
+from docopt import docopt
+from ebs import bcoeff_ebs
+
+# Columns (in order) of a stress export
+cols = ("panel", "lc", "D", "t", "l", "sa", "sm", "tau", "sh")
+# Columns (in order) of governing results
+gcols = ("panel", "lc", "sa", "sm", "tau", "sh", "sj", "lmbda", "fks",
+         "gM", "fksd", "uc")
+
+
+# CHARACTERISTIC BUCKLING STRENGTH AND UTILISATION
+def check(D, t, l, sa, sm, tau, sh, fy=355.0, ih=4):
+    """
+    Shell buckling check per DNVGL-RP-C202, 3.2 and 3.4, for arrays
+    of panels (D, t, l in mm) and design stresses (MPa): axial (sa),
+    bending (sm), shear (tau), and circumferential (sh), with tension
+    positive. ih picks f_E for lateral (3) or hydrostatic (4) pressure.
+    Returns (sj, lmbda, fks, gM, fksd, uc).
+    """
+    f_E = bcoeff_ebs(D, t, l)[1]
+    # Von Mises equivalent design stress, eq. 3.2.3
+    sj = np.sqrt((sa + sm) ** 2 - (sa + sm) * sh + sh ** 2 + 3 * tau ** 2)
+    # Compressive parts only (compression positive), eq. 3.4.4
+    sa0 = np.maximum(-sa, 0.0)
+    sm0 = np.maximum(-sm, 0.0)
+    sh0 = np.maximum(-sh, 0.0)
+    # Reduced shell slenderness, eq. 3.4.3
+    s = sa0 / f_E[..., 0] + sm0 / f_E[..., 1] + np.abs(tau) / f_E[..., 2]
+    s = s + sh0 / f_E[..., ih]
+    lmbda = np.sqrt((fy / np.where(sj > 0, sj, np.inf)) * s)
+    # Characteristic buckling strength, eq. 3.4.1
+    fks = fy / np.sqrt(1 + lmbda ** 4)
+    # Material factor, eq. 3.1.3
+    gM = np.where(
+        lmbda < 0.5, 1.15, np.where(lmbda > 1.0, 1.45, 0.85 + 0.60 * lmbda)
+    )
+    # Design buckling strength, and utilisation
+    fksd = fks / gM
+    return sj, lmbda, fks, gM, fksd, sj / fksd
+
+
+# READ A STRESS EXPORT IN CHUNKS
+def chunks(fn, n):
+    if fn.endswith(".npy"):
+        # Structured array, memory-mapped (nothing read until sliced)
+        a = np.load(fn, mmap_mode="r")
+        for i in range(0, a.shape[0], n):
+            yield {j: np.asarray(a[j][i : i + n], float) for j in cols}
+    else:
+        with open(fn) as f:
+            k = [i.strip() for i in f.readline().split(",")]
+            while True:
+                rows = list(islice(f, n))
+                if not rows:
+                    break
+                a = np.loadtxt(rows, delimiter=",", ndmin=2)
+                yield {j: a[:, k.index(j)] for j in cols}
+    pass
+
+
+# GOVERNING (MAXIMUM UTILISATION) LOAD CASE PER PANEL
+def govern(fn, fy=355.0, n=1000000, ih=4):
+    # Running governing results of panels seen so far, on sorted ids
+    ids = np.zeros(0, int)
+    g = {i: np.zeros(0) for i in gcols}
+    for c in chunks(fn, n):
+        res = dict(zip(gcols[6:], check(*(c[i] for i in cols[2:]), fy, ih)))
+        res.update((i, c[i]) for i in gcols[:6])
+        pid = c["panel"].astype(int)
+        # Chunk maximum per panel: last of each panel, sorted by uc
+        o = np.lexsort((res["uc"], pid))
+        last = np.r_[pid[o][1:] != pid[o][:-1], True]
+        o = o[last]
+        p = pid[o]
+        # Merge new panel ids into the running results
+        u = np.union1d(ids, p)
+        if len(u) > len(ids):
+            k = np.searchsorted(u, ids)
+            for i in gcols:
+                a = np.full(len(u), -np.inf)
+                a[k] = g[i]
+                g[i] = a
+            ids = u
+        # Keep where the chunk governs
+        k = np.searchsorted(ids, p)
+        new = res["uc"][o] > g["uc"][k]
+        for i in gcols:
+            g[i][k[new]] = res[i][o][new]
+    return g
+
+
+def main():
+    args = docopt(__doc__, version="Shell buckling check, v0.1")
+    fy = float(args["--fy"])
+    ih = 3 if args["--lateral"] else 4
+    g = govern(args["FILE"], fy, int(args["--chunk"]), ih)
+    np.savetxt(
+        args["--out"],
+        np.column_stack([g[i] for i in gcols]),
+        fmt=["%d", "%d"] + ["%.4g"] * (len(gcols) - 2),
+        delimiter=",",
+        header=",".join(gcols),
+        comments="",
+    )
+    print(
+        "%d panels; max. utilisation %.3f (panel %d)"
+        % (len(g["uc"]), g["uc"].max(), g["panel"][g["uc"].argmax()])
+    )
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+sfr.py -- Seafastening support reactions of rigid cargo items from
+sea-transport inertia forces (see ves.py), for all items sharing a
+support layout and all motion cases, in one linear solve.
+2026 ckunte
+"""
+import numpy as np
+import ves
+
+"""
+Legend:
+  xyz -- Support locations (ns, 3) w.r.t. the item's support frame (m)
+  k -- Support stiffness (ns, 3) in x, y, z (kN/m); zero => free
+  m -- Cargo item mass (t)
+  cog -- Cargo item C.O.G. (n, 3) w.r.t. the support frame (m)
+  F -- Inertia forces (n, cases, 3) in x, y, z in terms of W
+"""
+
+# Acceleration due to gravity (m/s^2)
+g = 9.81
+
+
+# Rigid-body to support displacement, d = u + theta x p, as (3, 6)
+def kinematics(p):
+    x, y, z = p
+    return np.array([
+        [1.0, 0.0, 0.0, 0.0, z, -y],
+        [0.0, 1.0, 0.0, -z, 0.0, x],
+        [0.0, 0.0, 1.0, y, -x, 0.0],
+    ])
+
+
+# Rigid-body stiffness matrix (6, 6) of a support layout
+def stiffness(xyz, k):
+    B = np.array([kinematics(i) for i in xyz])  # (ns, 3, 6)
+    kB = np.asarray(k, float)[:, :, None] * B
+    return np.einsum("sij,sik->jk", B, kB), B, kB
+
+
+# Load vectors (6, n, cases): forces and moments about the frame origin
+def loads(m, cog, F):
+    W = g * np.asarray(m, float)[:, None, None]
+    f = W * np.asarray(F, float)
+    c = np.asarray(cog, float)[:, None, :]
+    return np.concatenate([f, np.cross(c, f)], axis=-1).transpose(2, 0, 1)
+
+
+# Load cases (roll +/-, pitch +/- per motion) from ves.deck() results
+def cases(Fc):
+    # Fc: (4, n, motions) => F: (n, 4 x motions, 3), where gravity and
+    # vertical inertia act downwards (-z), roll acts along y, and pitch
+    # acts along x. ves.deck() takes lever arms as distances from the
+    # C.O.R., so Fv is the larger (downward) value on either side, and
+    # the +/- pairs envelope both directions of roll and pitch
+    Fvr, Fvp, Fhr, Fhp = Fc
+    o = np.zeros_like(Fvr)
+    F = [
+        [o, Fhr, -Fvr],
+        [o, -Fhr, -Fvr],
+        [Fhp, o, -Fvp],
+        [-Fhp, o, -Fvp],
+    ]
+    return np.array(F).transpose(2, 0, 3, 1).reshape(Fvr.shape[0], -1, 3)
+
+
+def reactions(xyz, k, m, cog, F):
+    """
+    Support reactions (n, cases, ns, 3) in kN of items (mass m, C.O.G.
+    cog) under inertia forces F, on a shared support layout (xyz, k).
+    All items and cases are solved together against one stiffness
+    matrix; supports resist in proportion to their stiffness.
+    """
+    K, B, kB = stiffness(xyz, k)
+    P = loads(m, cog, F)
+    n, nc = P.shape[1:]
+    # Rigid-body displacements of shape (6, n x cases), one solve
+    U = np.linalg.solve(K, P.reshape(6, -1))
+    # Support forces = k * B * U, reacting the applied loads (-)
+    R = -np.einsum("sij,jc->csi", kB, U)
+    return R.reshape(n, nc, len(xyz), 3)
+
+
+def main():
+    # -- USER INPUTS --
+    # Support layout (4 corners of a 12m x 8m skid), on deck (z = 0)
+    xyz = np.array([
+        [-6.0, -4.0, 0.0],
+        [6.0, -4.0, 0.0],
+        [6.0, 4.0, 0.0],
+        [-6.0, 4.0, 0.0],
+    ])
+    # Support stiffness (kN/m): bearing (z) and stoppers (x, y)
+    k = np.array([[1e5, 1e5, 1e6]] * 4)
+    # Cargo items on the same layout: mass (t), C.O.G. w.r.t. layout
+    m = np.array([450.0, 620.0])
+    cog = np.array([[0.5, 0.2, 7.5], [-0.3, 0.0, 11.0]])
+    # Layout origin w.r.t. vessel C.O.R. (m)
+    x0 = np.array([35.0, 6.0, 8.0])
+    # -- END of USER INPUTS --
+    # Item C.O.G. w.r.t. vessel C.O.R. (signed; deck() takes distances)
+    c = cog + x0
+    F = cases(ves.deck(c[:, 0], c[:, 1], c[:, 2]))
+    R = reactions(xyz, k, m, cog, F)
+    # Governing reactions (kN) per support
+    for i, j in enumerate(xyz):
+        print(
+            "Support %d (%.1f, %.1f): max. uplift %.0f, bearing %.0f, "
+            "Rx %.0f, Ry %.0f"
+            % (
+                i + 1,
+                j[0],
+                j[1],
+                max(0.0, -R[:, :, i, 2].min()),
+                R[:, :, i, 2].max(),
+                np.abs(R[:, :, i, 0]).max(),
+                np.abs(R[:, :, i, 1]).max(),
+            )
+        )
+    pass
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,23 @@ a = [
 ]
 m = [3.0, 3.5, 4.0, 5.0]  # Slope
 r = [1.8e6, 1.0e5, 4.68e5, 1.0e6]  # Range limit for curves
+# Curves: (a1, m1, a2, m2, range limit)
+curves = {
+    "TJ": (a[0], m[0], a[1], m[3], r[0]),
+    "B": (a[2], m[2], a[3], m[3], r[1]),
+    "C": (a[4], m[1], a[5], m[3], r[2]),
+    "D": (a[6], m[0], a[7], m[3], r[3]),
+    "E": (a[8], m[0], a[9], m[3], r[3]),
+    "F": (a[10], m[0], a[11], m[3], r[3]),
+    "F2": (a[12], m[0], a[13], m[3], r[3]),
+    "G": (a[14], m[0], a[15], m[3], r[3]),
+    "W1": (a[16], m[0], a[17], m[3], r[3]),
+}
+# Plot colours, in the order of curves
+colors = [
+    "black", "magenta", "blue", "orange", "green",
+    "olive", "brown", "deeppink", "olivedrab",
+]
 
 
 def style():
@@ -43,18 +60,20 @@ def sncurve(curve, r_start, r_mid, r_end, a1, m1, a2, m2, graphcolor):
     return plt.loglog(n, s, base=10, color=graphcolor, linewidth=1.0)
 
 
+# Number of cycles to failure for stress ranges s (MPa; any shape)
+def cycles(s, curve):
+    a1, m1, a2, m2, rl = curves[curve]
+    s = np.asarray(s, float)
+    with np.errstate(divide="ignore"):
+        n1 = 10 ** a1 * s ** -m1
+        return np.where(n1 <= rl, n1, 10 ** a2 * s ** -m2)
+
+
 def main():
     # Plot all
     style()
-    sncurve("TJ curve", 1.0e3, r[0], 1.0e9, a[0], m[0], a[1], m[3], "black")
-    sncurve(" B curve", 1.0e3, r[1], 1.0e9, a[2], m[2], a[3], m[3], "magenta")
-    sncurve(" C curve", 1.0e3, r[2], 1.0e9, a[4], m[1], a[5], m[3], "blue")
-    sncurve(" D curve", 1.0e3, r[3], 1.0e9, a[6], m[0], a[7], m[3], "orange")
-    sncurve(" E curve", 1.0e3, r[3], 1.0e9, a[8], m[0], a[9], m[3], "green")
-    sncurve(" F curve", 1.0e3, r[3], 1.0e9, a[10], m[0], a[11], m[3], "olive")
-    sncurve("F2 curve", 1.0e3, r[3], 1.0e9, a[12], m[0], a[13], m[3], "brown")
-    sncurve(" G curve", 1.0e3, r[3], 1.0e9, a[14], m[0], a[15], m[3], "deeppink")
-    sncurve("W1 curve", 1.0e3, r[3], 1.0e9, a[16], m[0], a[17], m[3], "olivedrab")
+    for (k, (a1, m1, a2, m2, rl)), c in zip(curves.items(), colors):
+        sncurve("%2s curve" % k, 1.0e3, rl, 1.0e9, a1, m1, a2, m2, c)
     plt.legend(loc=0)
     plt.xlabel("Number of cycles, N")
     plt.ylabel("Hotspot stress, $\sigma$ (MPa)")
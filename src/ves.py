@@ -29,35 +29,110 @@ g = 9.81
 # Heave amplitude in terms of acceleration due to gravity, g
 h = 0.2
 
-args = docopt(__doc__, version='Influence of cargo eccentricity on sea-transport forces, version: 0.1')
-Tr = float(args['--tr'])
-Tp = float(args['--tp'])
-
+# Vessel classes per Noble Denton 0030/ND: single amplitude roll
+# and pitch (deg), and plot title
 r = [20.0, 25.0, 30.0] # In degrees
 p = [10.0, 12.5, 15.0] # In degrees
+vc = {
+    'l': (r[0], p[0], 'Large vessels (LOA > 140m, B > 30m)'),
+    'm': (r[0], p[1], 'Medium vessels & large cargo barges ($\\geq$76m, $\\geq$23m)'),
+    's': (r[1], p[2], 'Small cargo barges (<76m, <23m)'),
+    'v': (r[2], p[2], 'Small vessels (<76m, <23m)'),
+}
 
-def misc():
+def misc(fn):
     plt.legend(loc=0)
     plt.grid(True)
     plt.xlabel('L (m)')
     plt.ylabel('Inertia force in terms of W')
-    plt.show()
+    plt.savefig(fn)
+    plt.close()
     pass
 
-def pgr():
+def inertia(x, y, z, r, p, Tr, Tp):
+    # Inertia forces per unit weight for lever arms x, y, z (m; i.e.,
+    # distances) from vessel C.O.R, and roll, pitch (r, p in deg); all
+    # broadcast
+    r = r * np.pi / 180.0
+    p = p * np.pi / 180.0
     # Angular accelerations
     thta_r = r * (2 * np.pi / Tr)**2
     thta_p = p * (2 * np.pi / Tp)**2
-    # Lx, Ly, or Lz
-    x = np.linspace(0, 30) # Lx range from 0 -- 30m
-    y = np.linspace(0, 15) # Ly range from 0 -- 15m
-    z = np.linspace(0, 30) # Lz range from 0 -- 30m
     # Vertical force per unit mass
     Fvr = np.cos(r) + (y / g) * thta_r + h * np.cos(r)
     Fvp = np.cos(p) + (x / g) * thta_p + h * np.cos(p)
     # Horizontal force per unit mass
     Fhr = np.sin(r) + (z / g) * thta_r + h * np.sin(r)
     Fhp = np.sin(p) + (z / g) * thta_p + h * np.sin(p)
+    return Fvr, Fvp, Fhr, Fhp
+
+def deck(x, y, z, r=None, p=None, Tr=10., Tp=10.):
+    """
+    Inertia force coefficients (Fvr, Fvp, Fhr, Fhp) for cargo items
+    with C.O.G at x, y, z (1-D arrays, m) from vessel C.O.R, for each
+    vessel class in vc (default) or custom motions r, p (deg), Tr, Tp
+    (s), given as 1-D arrays. Coordinates are signed, but lever arms
+    are taken as distances (|x|, |y|, |z|), since roll and pitch act
+    both ways, so that forces are the governing magnitudes on either
+    side of the C.O.R. Returns an array of shape (4, items, motions).
+    """
+    if r is None:
+        r = [i[0] for i in vc.values()]
+        p = [i[1] for i in vc.values()]
+    x, y, z = [np.abs(np.asarray(i, float))[:, None] for i in (x, y, z)]
+    r, p, Tr, Tp = np.broadcast_arrays(r, p, Tr, Tp)
+    F = inertia(x, y, z, r, p, Tr, Tp)
+    res = np.empty((4, x.shape[0], r.shape[0]))
+    for i in range(4):
+        res[i] = F[i]
+    return res
+
+def table(r=None, p=None):
+    """
+    Inertia forces are affine in lever arm over period squared, i.e.,
+    F = a + b * L / T^2 (L => Ly, Lx, Lz, Lz; T => Tr, Tp, Tr, Tp),
+    so that a table of (a, b) per vessel class is exact, and needs no
+    interpolation. Returns an array of shape (4, 2, motions) for
+    (Fvr, Fvp, Fhr, Fhp), for classes in vc (default) or custom r, p.
+    """
+    if r is None:
+        r = [i[0] for i in vc.values()]
+        p = [i[1] for i in vc.values()]
+    r, p = np.broadcast_arrays(r, p)
+    r = r * np.pi / 180.0
+    p = p * np.pi / 180.0
+    tb = np.empty((4, 2, r.shape[0]))
+    tb[:, 0] = [(1 + h) * np.cos(r), (1 + h) * np.cos(p),
+                (1 + h) * np.sin(r), (1 + h) * np.sin(p)]
+    tb[:, 1] = [r, p, r, p]
+    tb[:, 1] *= (2 * np.pi)**2 / g
+    return tb
+
+def save_table(fn, tb):
+    np.savez(fn, tb=tb)
+    pass
+
+def load_table(fn):
+    with np.load(fn) as f:
+        return f['tb']
+
+def lookup(tb, x, y, z, Tr=10., Tp=10.):
+    # Inertia force coefficients from table tb for cargo items at x, y,
+    # z (1-D arrays, m; lever arms are distances, as in deck()), and
+    # periods Tr, Tp (scalars, or 1-D arrays per motion in tb); same as
+    # deck(), of shape (4, items, motions)
+    L = np.abs(np.array([y, x, z, z], float))[:, :, None]
+    T = np.array(np.broadcast_arrays(Tr, Tp, Tr, Tp), float)[:, None]
+    if T.ndim == 2:
+        T = T[:, :, None]
+    return tb[:, 0, None, :] + tb[:, 1, None, :] * L / T**2
+
+def pgr(r, p, Tr, Tp):
+    # Lx, Ly, or Lz
+    x = np.linspace(0, 30) # Lx range from 0 -- 30m
+    y = np.linspace(0, 15) # Ly range from 0 -- 15m
+    z = np.linspace(0, 30) # Lz range from 0 -- 30m
+    Fvr, Fvp, Fhr, Fhp = inertia(x, y, z, r, p, Tr, Tp)
     # Labels
     lbl = [
     "Fv (roll) incl. gravity (L => Ly)",
@@ -73,30 +148,16 @@ def pgr():
     pass
 
 def main():
-    if args['-l']:
-        r = r[0] * np.pi / 180.0 # in rad => 20 deg
-        p = p[0] * np.pi / 180.0 # in rad => 10 deg
-        plt.title('Large vessels (LOA > 140m, B > 30m)')
-        pgr()
-        misc()
-    elif args['-m']:
-        r = r[0] * np.pi / 180.0 # in rad => 20 deg
-        p = p[1] * np.pi / 180.0 # in rad => 12.5 deg
-        plt.title('Medium vessels & large cargo barges ($\geq$76m, $\geq$23m)')
-        pgr()
-        misc()
-    elif args['-s']:
-        r = r[1] * np.pi / 180.0 # in rad => 25 deg
-        p = p[2] * np.pi / 180.0 # in rad => 15 deg
-        plt.title('Small cargo barges (<76m, <23m)')
-        pgr()
-        misc()
-    elif args['-v']:
-        r = r[2] * np.pi / 180.0 # in rad => 30 deg
-        p = p[2] * np.pi / 180.0 # in rad => 15 deg
-        plt.title('Small vessels (<76m, <23m)')
-        pgr()
-        misc()
+    args = docopt(__doc__, version='Influence of cargo eccentricity on sea-transport forces, version: 0.1')
+    Tr = float(args['--tr'])
+    Tp = float(args['--tp'])
+    for i in vc:
+        if args['-' + i]:
+            r, p, title = vc[i]
+            plt.title(title)
+            pgr(r, p, Tr, Tp)
+            misc('ves-%s.png' % i)
+            break
     else:
         print("No option was selected. For help, try: python ves.py -h")
     pass
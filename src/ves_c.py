@@ -30,34 +30,37 @@ g = 9.81
 # Heave amplitude in terms of acceleration due to gravity, g
 h = 0.2
 
-args = docopt(__doc__, version='Custom vessel: Infl. of cargo ecc. on inertia forces, version: 0.1')
-r = float(args['--r'])
-p = float(args['--p'])
-Tr = float(args['--tr'])
-Tp = float(args['--tp'])
-
-def misc():
+def misc(fn):
     plt.legend(loc=0)
     plt.grid(True)
     plt.xlabel('L (m)')
     plt.ylabel('Inertia force in terms of W')
-    plt.show()
+    plt.savefig(fn)
+    plt.close()
     pass
 
-def pgr():
+def inertia(x, y, z, r, p, Tr, Tp):
+    # Inertia forces per unit weight for lever arms x, y, z (m) from
+    # vessel C.O.R, and roll, pitch (r, p in deg); all broadcast
+    r = r * np.pi / 180.0
+    p = p * np.pi / 180.0
     # Angular accelerations
     thta_r = r * (2 * np.pi / Tr)**2
     thta_p = p * (2 * np.pi / Tp)**2
-    # Lx, Ly, or Lz
-    x = np.linspace(0, 30) # Lx range from 0 -- 30m
-    y = np.linspace(0, 15) # Ly range from 0 -- 15m
-    z = np.linspace(0, 30) # Lz range from 0 -- 30m
     # Vertical force per unit mass
     Fvr = np.cos(r) + (y / g) * thta_r + h * np.cos(r)
     Fvp = np.cos(p) + (x / g) * thta_p + h * np.cos(p)
     # Horizontal force per unit mass
     Fhr = np.sin(r) + (z / g) * thta_r + h * np.sin(r)
     Fhp = np.sin(p) + (z / g) * thta_p + h * np.sin(p)
+    return Fvr, Fvp, Fhr, Fhp
+
+def pgr(r, p, Tr, Tp):
+    # Lx, Ly, or Lz
+    x = np.linspace(0, 30) # Lx range from 0 -- 30m
+    y = np.linspace(0, 15) # Ly range from 0 -- 15m
+    z = np.linspace(0, 30) # Lz range from 0 -- 30m
+    Fvr, Fvp, Fhr, Fhp = inertia(x, y, z, r, p, Tr, Tp)
     # Labels
     lbl = [
     "Fv (roll) incl. gravity (L => Ly)",
@@ -73,11 +76,14 @@ def pgr():
     pass
 
 def main():
-    r = r * np.pi / 180.0 # in rad
-    p = p * np.pi / 180.0 # in rad
+    args = docopt(__doc__, version='Custom vessel: Infl. of cargo ecc. on inertia forces, version: 0.1')
+    r = float(args['--r'])
+    p = float(args['--p'])
+    Tr = float(args['--tr'])
+    Tp = float(args['--tp'])
     plt.title('Custom vessel')
-    pgr()
-    misc()
+    pgr(r, p, Tr, Tp)
+    misc('ves_c.png')
     pass
 
 if __name__ == '__main__':
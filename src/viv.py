@@ -1,45 +1,245 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Check for vortex-induced vibration occurrence in drill casing 
+Check for vortex-induced vibration occurrence in drill casing
 due to seawater current, based on DNV-RP-C205
-viv.py -- 2019-21 ckunte
+viv.py -- 2019-26 ckunte
 Jul 19, 2019: Initial commit
 Jan 29, 2021: Code re-factored
+Oct 17, 2026: Vectorised screening of pipes, lengths, and currents,
+              and higher modes in sheared current
 """
+from functools import lru_cache
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.linalg import eig_banded
+import sncurves
 
+# End conditions: Roark coefficients, c
+ec = {
+    "fixed": 22.2,
+    "clamped": 15.4,
+    "simply-supported": 9.87,
+    "cantilevered": 3.52,
+}
+# End conditions: restrained (w, theta) at either end, for modes()
+ecr = {
+    "fixed": ((1, 1), (1, 1)),
+    "clamped": ((1, 1), (1, 0)),
+    "simply-supported": ((1, 0), (1, 0)),
+    "cantilevered": ((1, 1), (0, 0)),
+}
+# Lock-in: in-line (with Ks <= 1.8), and cross flow ranges of vr
+vil = (1.0, 4.5)
+vcf = (3.0, 16.0)
+Ksil = 1.8
+# Simplified VIV response amplitudes, A/D against vr (after DNV-RP-F105):
+# in-line (with Ks <= 1.8), and cross flow
+Ail = ((1.0, 2.5, 3.5, 4.5), (0.0, 0.15, 0.15, 0.0))
+Acf = ((3.0, 5.0, 7.0, 16.0), (0.0, 0.9, 0.9, 0.0))
 
-def vivc(*args):
-    for i in D:
-        # Pipe cross sectional area (m^2):
-        A = (np.pi / 4.0) * (i ** 2 - (i - 2 * t) ** 2)
-        # Pipe cross sectional moment of inertia (m^4):
-        I = (np.pi / 64.0) * (i ** 4 - (i - 2 * t) ** 4)
-        # Mass of pipe (kg/m):
-        Ms = A * ys
-        # Added mass (kg/m):
-        Ma = cm * rho * np.pi * (i + 2 * tm) ** 2 / 4.0
-        # Entrained mass (kg/m):
-        Mi = f * rho * (np.pi / 4) * (i - 2 * t) ** 2
-        # Marine growth mass (kg/m):
-        Mg = np.pi * (i + tm) * tm * ym
-        # Total mass (kg/m):
-        Mtot = Ms + Ma + Mi + Mg
-        # Pipe natural frequency (Roark):
-        fn = (0.5 * c / np.pi) * (E * I / (Mtot * l ** 4)) ** 0.5
-        # Stability parameter (Ks):
-        Ks = 2 * Mtot * (2 * np.pi * beta) / (rho * (i + 2 * tm) ** 2)
-        # Reduced velocity:
-        vr = v / (fn * i)
+
+# PIPE CROSS SECTIONAL AREA (m^2), AND MOMENT OF INERTIA (m^4)
+def section(D, t):
+    A = (np.pi / 4.0) * (D ** 2 - (D - 2 * t) ** 2)
+    I = (np.pi / 64.0) * (D ** 4 - (D - 2 * t) ** 4)
+    return A, I
+
+
+# MASS PER UNIT LENGTH (kg/m): PIPE, ADDED, ENTRAINED, MARINE GROWTH
+def mass(D, t, f=1, tm=0.0, ys=7850.0, rho=1025.0, ym=575.0, cm=None):
+    # Added mass coefficient (hydrodynamic property)
+    cm = np.where(np.asarray(tm) > 0.0, 1.2, 1.6) if cm is None else cm
+    Ms = section(D, t)[0] * ys
+    Ma = cm * rho * np.pi * (D + 2 * tm) ** 2 / 4.0
+    Mi = f * rho * (np.pi / 4) * (D - 2 * t) ** 2
+    Mg = np.pi * (D + tm) * tm * ym
+    return Ms, Ma, Mi, Mg
+
+
+# NATURAL FREQUENCY FACTOR (fn = k c / l^2), AND STABILITY PARAMETER
+def props(D, t, tm=0.0, f=1, E=2.05e11, ys=7850.0, rho=1025.0, beta=0.05,
+          ym=575.0, cm=None):
+    Mtot = sum(mass(D, t, f, tm, ys, rho, ym, cm))
+    # Pipe natural frequency (Roark), fn = k c / l^2
+    k = (0.5 / np.pi) * np.sqrt(E * section(D, t)[1] / Mtot)
+    # Stability parameter (Ks)
+    Ks = 2 * Mtot * (2 * np.pi * beta) / (rho * (D + 2 * tm) ** 2)
+    return k, Ks
+
+
+def screen(D, t, l, c, v, tm=0.0, f=1, E=2.05e11, ys=7850.0, rho=1025.0,
+           beta=0.05, ym=575.0, cm=None):
+    """
+    Reduced velocity (vr), stability parameter (Ks), and in-line and
+    cross flow lock-in flags for pipes (D, t), lengths (l), end
+    conditions (c), currents (v), and marine growth (tm), all of which
+    broadcast, e.g., np.ix_(D, t, l, c, v, tm) => a 6-D screen. Section
+    and mass terms are evaluated before broadcasting against l, c and
+    v, so that only vr and the flags are of the full shape.
+    """
+    k, Ks = props(D, t, tm, f, E, ys, rho, beta, ym, cm)
+    # Reduced velocity, vr = v / (fn D)
+    vr = (v / (k * D)) * (np.square(l) / c)
+    il = (vr >= vil[0]) & (vr <= vil[1]) & (Ks <= Ksil)
+    cf = (vr >= vcf[0]) & (vr <= vcf[1])
+    return vr, Ks, il, cf
+
+
+def onset(D, t, c, v, tm=0.0, f=1, E=2.05e11, ys=7850.0, rho=1025.0,
+          beta=0.05, ym=575.0, cm=None):
+    """
+    Maximum unsupported length (m) before VIV onset, i.e., where vr
+    reaches in-line lock-in (or cross flow, if Ks > 1.8), for pipes,
+    end conditions, currents and marine growth that broadcast as in
+    screen(). As vr goes as l^2, it is solved in closed form. Returns
+    the maximum length, and in-line and cross flow onset lengths.
+    """
+    k, Ks = props(D, t, tm, f, E, ys, rho, beta, ym, cm)
+    L2 = k * c * D / v
+    Lil = np.sqrt(vil[0] * L2)
+    Lcf = np.sqrt(vcf[0] * L2)
+    return np.where(Ks <= Ksil, Lil, Lcf), Lil, Lcf
+
+
+def vcrit(D, t, l, c, tm=0.0, f=1, E=2.05e11, ys=7850.0, rho=1025.0,
+          beta=0.05, ym=575.0, cm=None):
+    # Critical current (m/s) at VIV onset for lengths l, see onset()
+    k, Ks = props(D, t, tm, f, E, ys, rho, beta, ym, cm)
+    vr = np.where(Ks <= Ksil, vil[0], vcf[0])
+    return vr * k * c * D / np.square(l)
+
+
+# NATURAL FREQUENCIES (Hz), MODE SHAPES AND CURVATURES OF A UNIFORM BEAM
+@lru_cache(maxsize=None)
+def modes(EI, m, L, bc, N=5, ne=50):
+    """
+    First N modes of a beam (EI in Nm^2, m in kg/m, length L in m) with
+    end condition bc (see ecr) from ne Euler-Bernoulli elements. Mass
+    is lumped (HRZ), so that the eigenproblem is made standard by the
+    mass, and stays banded for eig_banded(). Returns frequencies (N),
+    mode shapes (N, ne + 1) at the nodes (max. 1), and their max.
+    curvatures (N, 1/m). Cached per input, so reuse across current
+    profiles is free.
+    """
+    le = L / ne
+    n = 2 * (ne + 1)
+    K = np.zeros((n, n))
+    k = (EI / le ** 3) * np.array([
+        [12.0, 6 * le, -12.0, 6 * le],
+        [6 * le, 4 * le ** 2, -6 * le, 2 * le ** 2],
+        [-12.0, -6 * le, 12.0, -6 * le],
+        [6 * le, 2 * le ** 2, -6 * le, 4 * le ** 2],
+    ])
+    for i in range(ne):
+        K[2 * i : 2 * i + 4, 2 * i : 2 * i + 4] += k
+    M = np.zeros(n)
+    for i in range(ne):
+        M[2 * i : 2 * i + 4] += m * le * np.array([0.5, le ** 2 / 78.0] * 2)
+    # Free DOFs
+    r = np.zeros(n, bool)
+    r[:2], r[-2:] = ecr[bc]
+    K, M = K[~r][:, ~r], M[~r]
+    # Standard form, M^-1/2 K M^-1/2, as upper bands (bandwidth 3)
+    s = 1.0 / np.sqrt(M)
+    A = s[:, None] * K * s
+    ab = np.array([np.r_[np.zeros(3 - i), np.diagonal(A, 3 - i)]
+                   for i in range(4)])
+    w, u = eig_banded(ab, select="i", select_range=(0, N - 1))
+    u0 = np.zeros((n, N))
+    u0[~r] = s[:, None] * u
+    u0 = u0 / np.abs(u0[::2]).max(0)
+    w1, t1, w2, t2 = u0[0:-2:2], u0[1:-2:2], u0[2::2], u0[3::2]
+    # Curvature (1/m) at element ends (Hermite cubics), per unit mode
+    kappa = np.maximum(
+        np.abs(-6 * w1 - 4 * le * t1 + 6 * w2 - 2 * le * t2),
+        np.abs(6 * w1 + 2 * le * t1 - 6 * w2 + 4 * le * t2),
+    ).max(0) / le ** 2
+    phi = u0[::2].T
+    fn = np.sqrt(w) / (2 * np.pi)
+    for i in (fn, phi, kappa):
+        i.flags.writeable = False
+    return fn, phi, kappa
+
+
+def vivm(D, t, L, bc, x, v, N=5, tm=0.0, f=1, E=2.05e11, ys=7850.0,
+         rho=1025.0, beta=0.05, ym=575.0, cm=None, ne=50):
+    """
+    Multi-mode VIV check of spans (D, t, L: 1-D arrays that broadcast)
+    with end condition bc in current profiles v (profiles, x), where x
+    (m) runs along the span from its first end. Each mode is checked
+    for its reduced velocity at its mode-shape weighted current, i.e.,
+    where the mode responds. Returns frequencies (spans, N), reduced
+    velocity (spans, profiles, N), Ks (spans), and in-line and cross
+    flow lock-in flags (spans, profiles, N).
+    """
+    D, t, L = np.broadcast_arrays(*(np.atleast_1d(i).astype(float)
+                                    for i in (D, t, L)))
+    v = np.atleast_2d(v)
+    Mtot = sum(mass(D, t, f, tm, ys, rho, ym, cm))
+    EI = E * section(D, t)[1]
+    Ks = props(D, t, tm, f, E, ys, rho, beta, ym, cm)[1]
+    fn = np.empty((len(D), N))
+    vr = np.empty((len(D), v.shape[0], N))
+    xn = np.linspace(0.0, 1.0, ne + 1)
+    for i in range(len(D)):
+        fn[i], phi = modes(EI[i], Mtot[i], L[i], bc, N, ne)[:2]
+        # Currents at nodes, by linear interpolation (nodes, x)
+        I = np.array([np.interp(xn * L[i], x, j) for j in np.eye(len(x))])
+        # Mode-shape (|phi|) weighted currents
+        a = np.abs(phi) / np.abs(phi).sum(1, keepdims=True)
+        vr[i] = (v @ (I @ a.T)) / (fn[i] * D[i])
+    Ks = np.broadcast_to(Ks, D.shape)
+    il = (vr >= vil[0]) & (vr <= vil[1]) & (Ks[:, None, None] <= Ksil)
+    cf = (vr >= vcf[0]) & (vr <= vcf[1])
+    return fn, vr, Ks, il, cf
+
+
+def fatigue(D, t, L, bc, x, v, p, curve="F", N=5, scf=1.0, tm=0.0, f=1,
+            E=2.05e11, ys=7850.0, rho=1025.0, beta=0.05, ym=575.0, cm=None,
+            ne=50):
+    """
+    Annual VIV fatigue damage (Miner sum) of spans, as in vivm(), for a
+    current distribution: profiles v (bins, x) with probabilities p
+    (bins). Modal response amplitudes per bin (see Ail, Acf) are
+    converted to stress ranges (MPa) from the modes' max. curvature
+    and a stress concentration factor scf, and cycles at fn are summed
+    against the S-N curve (see sncurves.curves). Returns damage per
+    year (spans), and stress ranges (spans, bins, N, 2: in-line, cross
+    flow).
+    """
+    fn, vr, Ks = vivm(D, t, L, bc, x, v, N, tm, f, E, ys, rho, beta, ym, cm,
+                      ne)[:3]
+    D, t, L = np.broadcast_arrays(*(np.atleast_1d(i).astype(float)
+                                    for i in (D, t, L)))
+    Mtot = sum(mass(D, t, f, tm, ys, rho, ym, cm))
+    EI = E * section(D, t)[1]
+    kappa = np.array([modes(EI[i], Mtot[i], L[i], bc, N, ne)[2]
+                      for i in range(len(D))])
+    # Response amplitudes (m), and stress ranges (MPa)
+    A = np.stack([
+        np.interp(vr, *Ail) * (Ks[:, None, None] <= Ksil),
+        np.interp(vr, *Acf),
+    ], -1) * D[:, None, None, None]
+    s = E * 1e-6 * scf * 0.5 * D[:, None] * kappa
+    S = 2 * A * s[:, None, :, None]
+    # Cycles per year at fn in each bin, against cycles to failure
+    n = np.asarray(p)[:, None, None] * fn[:, None, :, None] * 3600 * 8766
+    return (n / sncurves.cycles(S, curve)).sum((1, 2, 3)), S
+
+
+def vivc(D, t, l, f, c, E, ys, rho, beta, v, tm, ym, cm):
+    D = np.asarray(D, float)
+    vr, Ks = screen(D[:, None], t, l, c, v, tm, f, E, ys, rho, beta, ym,
+                    cm)[:2]
+    for i, j, k in zip(D, vr, np.ravel(Ks)):
         lbl = "%0.0f$\\times$ %0.0f (D/t=%.1f), Ks=%.1f" % (
             (i * 1e3),
             (t * 1e3),
             (i / t),
-            Ks,
+            k,
         )
-        plt.plot(l, vr, label=lbl)
+        plt.plot(l, j, label=lbl)
         pass
     plt.title("VIV check for %.1fm/s current" % v)
     # In-line VIV occurrence limits ( 1.0 =< vr =< 4.5 )
@@ -67,12 +267,12 @@ if __name__ == "__main__":
     l = np.arange(0.1, 40.0, 0.1)
     # Pipe flooded state: (1 = flooded; 0 = buoyant)
     f = 1
-    # End condition, c: 
-    #   fixed = 22.2; 
+    # End condition (Roark coefficient, c; see ec):
+    #   fixed = 22.2;
     #   clamped = 15.4;
-    #   simply-supported = 9.87; 
+    #   simply-supported = 9.87;
     #   cantilevered = 3.52
-    c = 15.4
+    bc = "clamped"
     # Steel modulus of elasticity (N/m^2)
     E = 2.05e11
     # Steel density (kg/m^3)
@@ -87,9 +287,39 @@ if __name__ == "__main__":
     tm = 0.0
     # Marine growth density (kg/m^3)
     ym = 575.0
+    # Span (m), and current profile along it (m, m/s) for higher modes,
+    # and no. of modes
+    Ls = 40.0
+    xp = [0.0, 40.0]
+    vp = [v, 0.5 * v]
+    N = 4
+    # Current distribution for fatigue: speeds at the first end (m/s)
+    # with the profile as above, their probabilities, and S-N curve
+    vb = np.linspace(0.05, 1.0, 20)
+    pb = np.exp(-((vb / 0.35) ** 1.5))
+    pb = pb / pb.sum()
+    curve = "F"
     # -- END of USER INPUTS --
+    c = ec[bc]
     # Added mass coefficient (hydrodynamic property)
     cm = 1.2 if (tm > 0.0) else 1.6
     # Plot pipe length versus reduced velocity
     vivc(D, t, l, f, c, E, ys, rho, beta, v, tm, ym, cm)
-    pass
\ No newline at end of file
+    # Maximum unsupported length before VIV onset
+    Lmax = onset(np.array(D), t, c, v, tm, f, E, ys, rho, beta, ym, cm)[0]
+    for i, j in zip(D, Lmax):
+        print("%0.0f x %0.0f: %.1fm" % (i * 1e3, t * 1e3, j))
+    # Modes locked-in (in-line or cross flow) in the current profile
+    fn, vr, Ks, il, cf = vivm(D, t, Ls, bc, xp, vp, N, tm, f, E, ys, rho,
+                              beta, ym, cm)
+    for i, j, k in zip(D, fn, il[:, 0] | cf[:, 0]):
+        print("%0.0f x %0.0f: fn = %s Hz; lock-in modes: %s" % (
+            i * 1e3, t * 1e3, np.round(j, 2), np.flatnonzero(k) + 1))
+    # VIV fatigue life (years)
+    vf = vb[:, None] * np.array(vp) / vp[0]
+    dmg = fatigue(D, t, Ls, bc, xp, vf, pb, curve, N, 1.0, tm, f, E, ys, rho,
+                  beta, ym, cm)[0]
+    for i, j in zip(D, dmg):
+        print("%0.0f x %0.0f: fatigue life %.3g years" % (
+            i * 1e3, t * 1e3, 1.0 / j if j > 0 else np.inf))
+    pass
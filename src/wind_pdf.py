@@ -3,9 +3,32 @@
 """
 wind_pdf.py: 2016 ckunte
 """
+from itertools import zip_longest
 import numpy as np
 import matplotlib.pyplot as plt
 
+def wpdf(x, k, s):
+    # Weibull probability density function of shape k and scale s
+    return (k / s) * ((x / s)**(k - 1.)) * np.exp(-(x / s)**k)
+
+def plot(k, ls, lf, fn='pdf.svg'):
+    x = np.linspace(0.,2.5)
+
+    for i, j in zip_longest(ls, lf):
+        if i is not None:
+            fs = wpdf(x, k, i)
+            plt.plot(x, fs, linewidth=2, label='Mean/nominal speed: %0.2f' %i)
+        if j is not None:
+            ff = wpdf(x, k, j)
+            plt.plot(x, ff, linewidth=2, label='Mean/nominal force: %0.2f' %j)
+
+    plt.ylabel('Probability density function (pdf) of wind speed')
+    plt.xlabel('Normalised wind speed')
+    plt.grid(True)
+    plt.legend(loc=0)
+    plt.savefig(fn)
+    pass
+
 def main():
     # Weibull distribution: probability distribution function 
     # (for extra-tropical storms)
@@ -16,21 +39,9 @@ def main():
 
     k = 5. # Safety index
 
-    x = np.linspace(0.,2.5)
-
-    for i, j in zip(ls, lf):
-        fs = (k / i) * ((x / i)**(k - 1.)) * np.exp(-(x / i)**k)
-        plt.plot(x, fs, linewidth=2, label='Mean/nominal speed: %0.2f' %i)
-        ff = (k / j) * ((x / j)**(k - 1.)) * np.exp(-(x / j)**k)
-        plt.plot(x, ff, linewidth=2, label='Mean/nominal force: %0.2f' %j)
-
-    plt.ylabel('Probability density function (pdf) of wind speed')
-    plt.xlabel('Normalised wind speed')
-    plt.grid(True)
-    plt.legend(loc=0)
-    plt.savefig('pdf.svg')
+    plot(k, ls, lf)
     plt.show()
     pass
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()